@@ -1,11 +1,12 @@
 import os
-import openpyxl
-import threading
-import re
 import webbrowser
-import tempfile
-import uuid
-from queue import Queue
+from sheet_refresh import LiveSheet, SheetWatcher
+from audio_cache import AudioCache
+from prefetch import Prefetcher
+from tts_service import TTSService
+from file_store import StoreReaper
+from playback import PlaybackEngine
+from speech_worker import PYTTS_RATE_MAP, SpeechWorker
 from tkinter import (
     Tk, Button, Frame, filedialog,
     Entry, Label, messagebox, StringVar, OptionMenu, Checkbutton, BooleanVar
@@ -17,11 +18,6 @@ root.title("엑셀 음성 리더 (edge-tts 고속모드)")
 root.geometry("920x600")
 root.configure(padx=20, pady=20)
 
-# ====== 새로 추가된 모듈 ======
-import asyncio
-import edge_tts
-from playsound import playsound
-
 # ====== 폴백 엔진 ======
 try:
     import pyttsx3
@@ -36,7 +32,6 @@ current_row = 2
 file_path = None
 reading = False
 
-tts_queue = Queue()
 last_spoken = [None]
 
 engine_mode = StringVar(master=root, value="edge-tts")  # "edge-tts" | "pyttsx3"
@@ -46,24 +41,14 @@ speed_var = StringVar(master=root, value="3")  # 1~5
 announce_group_var = BooleanVar(master=root, value=True)
 
 EDGE_RATE_MAP = {"1": "-25%", "2": "-15%", "3": "+0%", "4": "+15%", "5": "+25%"}
-PYTTS_RATE_MAP = {"1": 150, "2": 175, "3": 200, "4": 225, "5": 260}
-
-_pyttsx_engine = [None]
-def _pytts_engine_ref():
-    return _pytts_engine[0]
+EDGE_VOICE = "ko-KR-SunHiNeural"
 
-def _init_pyttsx():
-    if not PYTTSX3_AVAILABLE:
-        return None
-    try:
-        eng = pyttsx3.init(driverName='sapi5')
-        rate = PYTTS_RATE_MAP.get(speed_var.get(), 200)
-        eng.setProperty('rate', rate)
-        eng.setProperty('volume', 1.0)
-        _pytts_engine[0] = eng
-        return eng
-    except Exception:
-        return None
+# pyttsx3 엔진은 전용 워커 스레드에서 한 번만 초기화 (처음 쓸 때 생성)
+_pytts_worker = [None]
+def _pytts_worker_ref():
+    if _pytts_worker[0] is None and PYTTSX3_AVAILABLE:
+        _pytts_worker[0] = SpeechWorker(engine_factory=lambda: pyttsx3.init(driverName='sapi5'))
+    return _pytts_worker[0]
 
 # =========================
 # 유틸
@@ -71,142 +56,135 @@ def _init_pyttsx():
 def set_speed(sp):
     speed_var.set(str(sp))
 
+# 열린 파일의 행 모델. 근무 중 엑셀에서 수정·저장하면 감시 스레드가 바뀐 행만 반영
+live_sheet = [None]
+sheet_watcher = [None]
+
+def on_sheet_changed(changed_rows, stale_texts):
+    # 수정된 문장의 오디오만 캐시에서 지우고, 예약된 미리 합성은 다음 읽기 때 다시 계산
+    for text in stale_texts:
+        for rate in EDGE_RATE_MAP.values():
+            audio_cache.discard(text, EDGE_VOICE, rate)
+    prefetcher.cancel()
+    last_spoken[0] = None
+    name = os.path.basename(live_sheet[0].path)
+    root.after(0, lambda: file_label.config(
+        text=f"선택된 파일: {name} (수정된 행 {len(changed_rows)}개 반영)"))
+
+def load_sheet(path):
+    # G~L열 파싱 + 문장 구성기 생성, 파일 감시 시작
+    # 새 파일을 먼저 읽고, 성공했을 때만 이전 파일 감시를 중지하고 교체 (실패하면 이전 시트 유지)
+    sheet = LiveSheet(path)
+    if sheet_watcher[0] is not None:
+        sheet_watcher[0].stop()
+    live_sheet[0] = sheet
+    sheet_watcher[0] = SheetWatcher(sheet, on_change=on_sheet_changed).start()
+    return sheet
+
 def open_excel():
     global file_path
-    file_path = filedialog.askopenfilename(filetypes=[("Excel files", "*.xlsx;*.xls")])
-    if file_path:
-        try:
-            os.startfile(file_path)
-            file_label.config(text=f"선택된 파일: {os.path.basename(file_path)}")
-        except Exception as e:
-            messagebox.showerror("오류", f"파일 열기 실패: {e}")
+    path = filedialog.askopenfilename(filetypes=[("Sheet files", "*.xlsx;*.xls;*.csv;*.tsv"),
+                                                  ("Excel files", "*.xlsx;*.xls"),
+                                                  ("CSV/TSV files", "*.csv;*.tsv")])
+    if not path:
+        return
+    try:
+        load_sheet(path)
+    except Exception as e:
+        # file_path 는 이전 파일 그대로 두어 live_sheet 와 어긋나지 않게 함
+        messagebox.showerror("오류", f"파일 열기 실패: {e}")
+        return
+    file_path = path
+    file_label.config(text=f"선택된 파일: {os.path.basename(file_path)}")
+    try:
+        os.startfile(file_path)
+    except Exception as e:
+        messagebox.showerror("오류", f"엑셀 실행 실패: {e}")
 
 def update_display_text(row_num, i_value, j_value, k_value, l_value):
     # 행번호는 화면 표시만, 음성으로는 읽지 않음
     display_text.set(f"{row_num} | {i_value}  {j_value}  {k_value}  {l_value}")
 
-def clean_g_value(text):
-    return re.sub(r"\(.*?\)", "", text).strip()
-
-def count_consecutive_g_values(ws, start_row):
-    current_g = clean_g_value(str(ws.cell(row=start_row, column=7).value or ""))
-    count = 0
-    max_row = ws.max_row
-    for row in range(start_row, max_row + 1):
-        g_value = clean_g_value(str(ws.cell(row=row, column=7).value or ""))
-        if g_value == current_g:
-            count += 1
-        else:
-            break
-    return count
-
-size_dict = {
-    "XS": "엑스스몰", "S": "스몰", "M": "미디움", "L": "라지", "FREE": "프리",
-    "XL": "엑스라지", "XXL": "투엑스라지",
-    "JS": "주니어 스몰", "JM": "주니어 미디움", "JL": "주니어 라지"
-}
-def convert_size(size_code):
-    return size_dict.get(str(size_code).upper(), size_code)
-
-korean_number_map = {
-    1: "한개", 2: "두개", 3: "세개", 4: "네개",
-    5: "다섯개", 6: "여섯개", 7: "일곱개",
-    8: "여덟개", 9: "아홉개", 10: "열개"
-}
-def convert_quantity(n):
-    if isinstance(n, int) and n >= 1:
-        return korean_number_map.get(n, f"{n}개")
-    return ""
+# =========================
+# TTS 재생(엔진별)
+# =========================
+# 같은 문장/음성/속도는 디스크 캐시에서 바로 재생 (합성 생략)
+audio_cache = AudioCache()
+# 오래 안 쓴 오디오 파일 주기 정리
+StoreReaper([audio_cache]).start()
+# 합성 전용 이벤트 루프 하나를 계속 사용 (발화마다 asyncio.run 하지 않음)
+tts_service = TTSService()
+# 현재 행 재생 중에 다음 행들을 미리 합성해 캐시에 채움
+prefetcher = Prefetcher(tts_service)
+# 최신 행만 재생: 새 행을 요청하면 재생 중인 클립을 끊고 바로 넘어감
+playback = PlaybackEngine()
+
+async def _edge_tts_synthesize_to_mp3(text, voice="ko-KR-SunHiNeural", rate="+0%"):
+    # 같은 문장을 미리 합성 중이면 그 결과를 함께 기다림
+    return await tts_service.shared((text, voice, rate),
+                                    lambda: audio_cache.get_or_synthesize(text, voice, rate))
+
+def _edge_tts_say(text, pytts_rate):
+    # 합성은 TTS 루프에서 바로 시작하고, 재생 엔진은 합성이 끝나는 대로 재생
+    rate = EDGE_RATE_MAP.get(speed_var.get(), "+0%")
+    future = tts_service.submit(_edge_tts_synthesize_to_mp3(text, voice=EDGE_VOICE, rate=rate))
+
+    def fallback(_):
+        # edge-tts 실패시 pyttsx3 폴백
+        _pyttsx3_say(text, pytts_rate)
+
+    playback.play(future, on_error=fallback)
+
+def _pyttsx3_say(text, rate):
+    worker = _pytts_worker_ref()
+    if worker:
+        worker.say(text, rate=rate)
 
 # =========================
-# 발화 큐잉 (한 행 = 한 문장 합성)
+# 발화 (한 행 = 한 문장 합성, 항상 가장 최근 행만 재생)
 # =========================
 def speak(text, force=False):
     if not text:
         return
     if force or text != last_spoken[0]:
-        tts_queue.put(("SAY", text))
+        pytts_rate = PYTTS_RATE_MAP.get(speed_var.get(), 200)
+        if engine_mode.get() == "edge-tts":
+            _edge_tts_say(text, pytts_rate)
+        else:
+            playback.stop()
+            _pyttsx3_say(text, pytts_rate)
         last_spoken[0] = text
 
-def flush_tts_queue():
-    try:
-        while not tts_queue.empty():
-            _ = tts_queue.get_nowait()
-            tts_queue.task_done()
-    except Exception:
-        pass
+def stop_speaking():
+    # 재생 중인 클립/문장을 끊고 대기 중인 요청도 버림
+    playback.stop()
+    if _pytts_worker[0] is not None:
+        _pytts_worker[0].cancel()
 
 # =========================
-# TTS 재생(엔진별)
+# 핵심 읽기 로직 (행번호 미발화 + G열 이름 복구)
 # =========================
-async def _edge_tts_synthesize_to_mp3(text, voice="ko-KR-SunHiNeural", rate="+0%"):
-    temp_dir = tempfile.gettempdir()
-    out_path = os.path.join(temp_dir, f"tts_{uuid.uuid4().hex}.mp3")
-    comm = edge_tts.Communicate(text, voice=voice, rate=rate)
-    await comm.save(out_path)
-    return out_path
-
-def _play_mp3_blocking(mp3_path):
-    playsound(mp3_path)
-
-def _edge_tts_say(text):
+def prefetch_next_rows(sheet, row, prev_g):
+    # 다음 행들을 가까운 순서대로 미리 합성 (행 점프/중지 시 이전 일정 취소)
+    if engine_mode.get() != "edge-tts":
+        prefetcher.cancel()
+        return
     rate = EDGE_RATE_MAP.get(speed_var.get(), "+0%")
-    voice = "ko-KR-SunHiNeural"
-    mp3_path = asyncio.run(_edge_tts_synthesize_to_mp3(text, voice=voice, rate=rate))
-    try:
-        _play_mp3_blocking(mp3_path)
-    finally:
-        try:
-            os.remove(mp3_path)
-        except Exception:
-            pass
-
-def _pyttsx3_say(text):
-    eng = _pytts_engine_ref() or _init_pyttsx()
-    if not eng:
-        raise RuntimeError("pyttsx3 초기화 실패")
-    rate = PYTTS_RATE_MAP.get(speed_var.get(), 200)
-    eng.setProperty('rate', rate)
-    eng.setProperty('volume', 1.0)
-    eng.say(text)
-    eng.runAndWait()
+    announce_group = announce_group_var.get()
 
-# =========================
-# TTS 워커(단일 스레드)
-# =========================
-_stop_worker = [False]
-def tts_worker():
-    while not _stop_worker[0]:
-        cmd = tts_queue.get()
-        if cmd is None:
-            tts_queue.task_done()
-            break
-        typ, payload = cmd
-        if typ == "SAY":
-            text = payload
-            try:
-                if engine_mode.get() == "edge-tts":
-                    _edge_tts_say(text)
-                else:
-                    _pyttsx3_say(text)
-            except Exception:
-                # edge-tts 실패시 pyttsx3 폴백
-                if engine_mode.get() == "edge-tts" and PYTTSX3_AVAILABLE:
-                    try:
-                        _pyttsx3_say(text)
-                    except Exception:
-                        pass
-            finally:
-                tts_queue.task_done()
-        else:
-            tts_queue.task_done()
+    def jobs():
+        composer = sheet.composer
+        prev = prev_g
+        for next_row in range(row + 1, sheet.max_row + 1):
+            combined = composer.sentence(next_row, prev, announce_group)
+            if combined is None:
+                break
+            prev = composer.g_value(next_row)
+            if combined.strip():
+                yield lambda text=combined: _edge_tts_synthesize_to_mp3(text, EDGE_VOICE, rate)
 
-tts_thread = threading.Thread(target=tts_worker, daemon=True)
-tts_thread.start()
+    prefetcher.schedule(jobs())
 
-# =========================
-# 핵심 읽기 로직 (행번호 미발화 + G열 이름 복구)
-# =========================
 prev_g_value = None
 def read_current_row(force_read=False):
     global current_row, prev_g_value, reading
@@ -215,64 +193,31 @@ def read_current_row(force_read=False):
         messagebox.showwarning("경고", "엑셀 파일을 먼저 열어주세요")
         return False
 
-    try:
-        wb = openpyxl.load_workbook(file_path, data_only=True)
-        ws = wb.active
-    except Exception as e:
-        messagebox.showerror("오류", f"엑셀 로드 실패: {e}\n파일이 열려 있으면 닫아주세요.")
+    sheet = live_sheet[0]
+    if sheet is None:
+        messagebox.showerror("오류", "엑셀 로드 실패: 파일을 다시 열어주세요.")
         return False
 
-    max_row = ws.max_row
-    if current_row > max_row:
-        messagebox.showinfo("알림", "더 이상 읽을 행이 없습니다")
-        reading = False
-        return False
+    # 감시 스레드가 행을 고치는 중이면 끝날 때까지 기다림
+    with sheet.lock:
+        composer = sheet.composer
+        row_data = sheet.data.get_row(current_row)
+        if current_row > sheet.max_row or row_data is None:
+            messagebox.showinfo("알림", "더 이상 읽을 행이 없습니다")
+            reading = False
+            return False
 
-    g_value = clean_g_value(str(ws.cell(row=current_row, column=7).value or ""))
-    h_value = str(ws.cell(row=current_row, column=8).value or "").strip()
-    i_value = str(ws.cell(row=current_row, column=9).value or "").strip()
-    j_value = str(ws.cell(row=current_row, column=10).value or "").strip()
-    k_value = str(ws.cell(row=current_row, column=11).value or "").strip()
+        l_value = composer.quantity(current_row)
+        display_l_value = str(l_value) if l_value else ""
+        update_display_text(current_row, row_data['i'], row_data['j'], row_data['k'], display_l_value)
 
-    # L열 수량: 2 이상만 읽기
-    try:
-        l_raw_value = ws.cell(row=current_row, column=12).value
-        l_value = int(l_raw_value) if l_raw_value and str(l_raw_value).isdigit() else None
-        if l_value is not None and l_value < 2:
-            l_value = None
-    except (ValueError, TypeError):
-        l_value = None
-
-    display_l_value = str(l_value) if l_value else ""
-    update_display_text(current_row, i_value, j_value, k_value, display_l_value)
-
-    # ===== 한 행 = 한 문장으로 합성 =====
-    parts = []
-
-    # ✅ G열(브랜드/묶음) 읽기: 값이 바뀌면 예전 방식대로 읽기(연속 개수 포함)
-    if announce_group_var.get() and g_value and g_value != prev_g_value:
-        g_count = count_consecutive_g_values(ws, current_row)
-        if g_count > 1:
-            parts.append(f"{g_value} {convert_quantity(g_count)}")
-        else:
-            parts.append(g_value)
-    prev_g_value = g_value
-
-    # 필수: 상품명, 색상, 사이즈, 수량
-    if i_value:
-        parts.append(i_value)
-    if j_value:
-        parts.append(j_value)
-    if k_value:
-        parts.append(convert_size(k_value))
-    if l_value is not None:
-        qty_txt = convert_quantity(l_value)
-        if qty_txt:
-            parts.append(qty_txt)
-
-    combined = " ".join([p for p in parts if p])
-    if combined.strip():
-        speak(combined, force=force_read)
+        parts = composer.parts(current_row, prev_g_value, announce_group_var.get())
+        prev_g_value = composer.g_value(current_row)
+
+        combined = " ".join(parts)
+        if combined.strip():
+            speak(combined, force=force_read)
+        prefetch_next_rows(sheet, current_row, prev_g_value)
 
     return True
 
@@ -298,7 +243,8 @@ def start_reading():
 def stop_reading():
     global reading
     reading = False
-    flush_tts_queue()
+    stop_speaking()
+    prefetcher.cancel()
 
 def schedule_auto_next():
     if not reading or not auto_advance_var.get():
@@ -333,10 +279,11 @@ def search_naver(event=None):
         messagebox.showwarning("경고", "파일을 먼저 선택하세요")
         return
     try:
-        wb = openpyxl.load_workbook(file_path, data_only=True)
-        ws = wb.active
-        h_value = str(ws.cell(row=current_row, column=8).value or "").strip()
-        i_value = str(ws.cell(row=current_row, column=9).value or "").strip()
+        sheet = live_sheet[0]
+        with sheet.lock:
+            row_data = sheet.data.get_row(current_row) or {}
+        h_value = row_data.get('h', "")
+        i_value = row_data.get('i', "")
     except Exception as e:
         messagebox.showerror("오류", f"검색 실패: {e}")
         return
@@ -444,12 +391,13 @@ root.bind('3', lambda e: search_naver())
 def on_closing():
     global reading
     reading = False
-    _stop_worker[0] = True
-    flush_tts_queue()
-    try:
-        tts_queue.put(None)
-    except Exception:
-        pass
+    prefetcher.cancel()
+    # 재생 프로세스가 남지 않도록 재생 엔진을 닫고 종료
+    playback.close()
+    if sheet_watcher[0] is not None:
+        sheet_watcher[0].stop()
+    if _pytts_worker[0] is not None:
+        _pytts_worker[0].stop()
     root.destroy()
 
 root.protocol("WM_DELETE_WINDOW", on_closing)
@@ -1,22 +1,63 @@
-from flask import Flask, render_template, request, jsonify, send_file
-import openpyxl
-import tempfile
+from flask import Flask, render_template, request, jsonify, send_from_directory, g, Response, redirect
+from urllib.parse import urlencode
+import queue
+import io
 import os
-import uuid
-import asyncio
-import edge_tts
-from werkzeug.utils import secure_filename
 import json
 from datetime import datetime
+from row_composer import RowComposer
+from sheet_refresh import estimate_changed, patch_rows, row_tuples
+from sheet_loader import load_any
+from audio_cache import AudioCache, EDGE_RATE_MAP, STREAM_CHUNK, TTS_MODE, fragments_text
+from prefetch import Prefetcher
+from tts_service import TTSService, DEFAULT_TIMEOUT
+from prerender import PrerenderJob, unique_row_jobs, DEFAULT_CONCURRENCY
+from session_store import SessionState, SessionStore
+from file_store import StoreReaper
 
 app = Flask(__name__)
-app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+# 스트리밍 로더는 열 수와 무관하게 메모리가 일정하므로 대용량 ERP 내보내기도 허용
+app.config['MAX_CONTENT_LENGTH'] = int(os.environ.get('MAX_UPLOAD_MB', '64')) * 1024 * 1024
 
-# 전역 변수
-current_row = 2
-file_data = None
-reading = False
-tts_queue = []
+# TTS 오디오 캐시 (같은 문장/음성/속도는 한 번만 합성)
+audio_cache = AudioCache()
+
+# 오래 안 쓴 오디오 파일 주기 정리 (업로드는 메모리에서 바로 읽으므로 디스크에 쓰지 않음)
+store_reaper = StoreReaper([audio_cache]).start()
+
+# 합성 전용 이벤트 루프 (요청마다 루프를 만들지 않고 모든 합성을 여기서 동시 처리)
+tts_service = TTSService()
+
+# 사용자별 상태 (시트, 현재 행, 미리 합성 일정, 사전 합성 작업)
+# 세션 ID 는 쿠키 또는 X-Session-Id 헤더로 전달
+SESSION_COOKIE = 'reader_sid'
+
+def _expire_session(state):
+    if state.prefetcher:
+        state.prefetcher.cancel()
+
+def _new_session():
+    # 다음 행 미리 합성 (깊이는 PREFETCH_DEPTH 환경변수 또는 요청의 prefetch 값)
+    # 세션을 만들 때 함께 만들어, 동시에 들어온 첫 요청들도 같은 Prefetcher 를 씀
+    return SessionState(prefetcher=Prefetcher(tts_service))
+
+sessions = SessionStore(on_expire=_expire_session, state_factory=_new_session)
+
+# 오디오 파일명은 (문장, 음성, 속도)의 해시라 내용이 바뀌지 않으므로 브라우저가 오래 캐시해도 됨
+AUDIO_MAX_AGE = 365 * 24 * 3600
+
+# /read_rows 한 번에 돌려주는 최대 행 수
+MAX_BATCH_ROWS = 200
+
+# /prerender 동시 합성 개수 상한 (클라이언트가 더 크게 요청해도 이 값까지만)
+MAX_PRERENDER_CONCURRENCY = int(os.environ.get('PRERENDER_MAX_CONCURRENCY', '8'))
+
+# 같은 이름의 파일을 다시 올렸을 때 이 비율 이하의 행만 바뀌었으면 수정본으로 보고 부분 반영
+# (그보다 많이 바뀌었으면 다른 날 내보낸 새 시트로 보고 처음부터. refresh=1 이면 항상 부분 반영)
+PATCH_MAX_CHANGED = float(os.environ.get('PATCH_MAX_CHANGED', '0.1'))
+
+# 업로드 가능한 시트 형식 (CSV/TSV 는 WMS 내보내기, 같은 G~L열 배치)
+UPLOAD_EXTENSIONS = ('.xlsx', '.xls', '.csv', '.tsv')
 
 # TTS 엔진 설정
 TTS_ENGINES = {
@@ -37,43 +78,57 @@ TTS_ENGINES = {
     }
 }
 
-# 사이즈 변환 딕셔너리
-SIZE_DICT = {
-    "XS": "엑스스몰", "S": "스몰", "M": "미디움", "L": "라지", "FREE": "프리",
-    "XL": "엑스라지", "XXL": "투엑스라지",
-    "JS": "주니어 스몰", "JM": "주니어 미디움", "JL": "주니어 라지"
-}
+def synthesize_parts(text_parts, voice, rate, mode):
+    if mode == 'fragments':
+        # 조각은 종류가 적어 대부분 캐시에 있으므로 새 행도 합성이 거의 필요 없음
+        return audio_cache.get_or_synthesize_fragments(text_parts, voice, rate)
+    return audio_cache.get_or_synthesize(" ".join(text_parts), voice, rate)
 
-# 한국어 숫자 변환
-KOREAN_NUMBER_MAP = {
-    1: "한개", 2: "두개", 3: "세개", 4: "네개",
-    5: "다섯개", 6: "여섯개", 7: "일곱개",
-    8: "여덟개", 9: "아홉개", 10: "열개"
-}
+def cached_row_audio(text_parts, voice, rate, mode):
+    # 이미 캐시에 있는 행 오디오의 /audio 경로 (없으면 None)
+    text = fragments_text(text_parts) if mode == 'fragments' else " ".join(text_parts)
+    path = audio_cache.peek(text, voice, rate)
+    return f'/audio/{os.path.basename(path)}' if path else None
 
-def convert_size(size_code):
-    return SIZE_DICT.get(str(size_code).upper(), size_code)
-
-def convert_quantity(n):
-    if isinstance(n, int) and n >= 1:
-        return KOREAN_NUMBER_MAP.get(n, f"{n}개")
-    return ""
-
-def clean_g_value(text):
-    import re
-    return re.sub(r"\(.*?\)", "", text).strip()
-
-def count_consecutive_g_values(ws, start_row):
-    current_g = clean_g_value(str(ws.cell(row=start_row, column=7).value or ""))
-    count = 0
-    max_row = ws.max_row
-    for row in range(start_row, max_row + 1):
-        g_value = clean_g_value(str(ws.cell(row=row, column=7).value or ""))
-        if g_value == current_g:
-            count += 1
-        else:
+def synthesize_row(text_parts, voice, rate, mode):
+    # 같은 행을 동시에 요청하면(현재 행 + 미리 합성) 합성은 한 번만. 서비스 루프에서 await
+    key = (mode, tuple(text_parts), voice, rate)
+    return tts_service.shared(key, lambda: synthesize_parts(text_parts, voice, rate, mode))
+
+def request_session_id():
+    return request.headers.get('X-Session-Id') or request.cookies.get(SESSION_COOKIE)
+
+def current_session():
+    # 요청의 세션 상태 (없으면 새로 만들고 응답에 쿠키 설정)
+    if 'session_state' not in g:
+        g.session_id, g.session_state = sessions.get_or_create(request_session_id())
+    return g.session_state
+
+@app.after_request
+def set_session_cookie(response):
+    if 'session_id' in g and request.cookies.get(SESSION_COOKIE) != g.session_id:
+        response.set_cookie(SESSION_COOKIE, g.session_id, httponly=True, samesite='Lax')
+        response.headers['X-Session-Id'] = g.session_id
+    return response
+
+def schedule_prefetch(prefetcher, sheet, row_num, voice, rate, mode, depth=None):
+    # row_num 다음 행들을 가까운 순서대로 미리 합성 (이전 일정은 취소)
+    # 진행 중인 일정(예: /read_rows 가 잡은 묶음)이 이 범위를 이미 덮고 있으면 그대로 둠
+    depth = prefetcher.depth if depth is None else depth
+    jobs = []
+    last_row = row_num
+    for next_row in range(row_num + 1, sheet['max_row'] + 1):
+        if len(jobs) >= depth:
             break
-    return count
+        last_row = next_row
+        parts = sheet['composer'].parts(next_row) or []
+        if " ".join(parts).strip():
+            jobs.append(lambda parts=parts: synthesize_row(parts, voice, rate, mode))
+    key = (id(sheet), voice, rate, mode)
+    rows = range(row_num + 1, last_row + 1)
+    if prefetcher.covers(key, rows):
+        return
+    prefetcher.schedule(jobs, len(jobs), key=key, rows=rows)
 
 @app.route('/')
 def index():
@@ -81,7 +136,7 @@ def index():
 
 @app.route('/upload', methods=['POST'])
 def upload_file():
-    global file_data, current_row
+    state = current_session()
     
     if 'file' not in request.files:
         return jsonify({'error': '파일이 선택되지 않았습니다.'}), 400
@@ -90,39 +145,46 @@ def upload_file():
     if file.filename == '':
         return jsonify({'error': '파일이 선택되지 않았습니다.'}), 400
     
-    if file and file.filename.lower().endswith(('.xlsx', '.xls')):
+    ext = os.path.splitext(file.filename)[1].lower()
+    if file and ext in UPLOAD_EXTENSIONS:
         try:
-            # 임시 파일로 저장
-            temp_path = os.path.join(tempfile.gettempdir(), f"temp_{uuid.uuid4().hex}.xlsx")
-            file.save(temp_path)
+            # 시트 읽기: 업로드 내용을 디스크에 쓰지 않고 메모리(BytesIO)에서 바로 파싱
+            # 형식(xlsx/예전 xls/CSV/TSV)은 확장자가 아니라 앞부분 매직 바이트로 판별 (G~L열만 추출)
+            data, max_row = load_any(io.BytesIO(file.read()))
+            refresh = request.form.get('refresh', '').lower() in ('1', 'true', 'on')
             
-            # 엑셀 파일 읽기
-            wb = openpyxl.load_workbook(temp_path, data_only=True)
-            ws = wb.active
-            
-            # 데이터 추출
-            data = []
-            max_row = ws.max_row
-            
-            for row in range(2, max_row + 1):  # 헤더 제외
-                row_data = {
-                    'row': row,
-                    'g': str(ws.cell(row=row, column=7).value or "").strip(),
-                    'h': str(ws.cell(row=row, column=8).value or "").strip(),
-                    'i': str(ws.cell(row=row, column=9).value or "").strip(),
-                    'j': str(ws.cell(row=row, column=10).value or "").strip(),
-                    'k': str(ws.cell(row=row, column=11).value or "").strip(),
-                    'l': ws.cell(row=row, column=12).value
+            with state.lock:
+                state.prefetcher.cancel()
+                previous = state.file_data
+                patchable = previous and (refresh or previous.get('filename') == file.filename)
+                # 행 튜플은 한 번만 만들어 추정과 부분 수정에 함께 사용
+                rows = patchable and (row_tuples(previous['data']), row_tuples(data))
+                if patchable and (refresh or estimate_changed(previous['data'], data, rows=rows)
+                                  <= PATCH_MAX_CHANGED * max(len(previous['data']), 1)):
+                    # 같은 파일을 수정해서 다시 올린 경우: 바뀐 행만 반영하고 현재 행 위치 유지
+                    # 오디오 캐시는 모든 세션이 함께 쓰고 키가 문장 내용이라 지우지 않음
+                    # (바뀐 행은 새 키로 찾고, 안 쓰는 파일은 LRU/주기 정리가 제거)
+                    changed_rows, _ = patch_rows(previous['data'], previous['composer'], data,
+                                                 rows=rows, collect_stale=False)
+                    previous['max_row'] = previous['data'].max_row
+                    total = len(previous['data'])
+                    return jsonify({
+                        'success': True,
+                        'filename': file.filename,
+                        'total_rows': total,
+                        'changed_rows': changed_rows[:MAX_BATCH_ROWS],
+                        'current_row': state.current_row,
+                        'message': f'{total}개의 행 중 {len(changed_rows)}개 행이 바뀌었습니다.'
+                    })
+                
+                # 문장 구성기 (G열 연속 구간 인덱스와 고유값 변환표를 한 번만 계산)
+                state.file_data = {
+                    'data': data,
+                    'max_row': max_row,
+                    'composer': RowComposer(data),
+                    'filename': file.filename
                 }
-                data.append(row_data)
-            
-            file_data = {
-                'path': temp_path,
-                'data': data,
-                'max_row': max_row
-            }
-            
-            current_row = 2
+                state.current_row = 2
             return jsonify({
                 'success': True,
                 'filename': file.filename,
@@ -130,89 +192,79 @@ def upload_file():
                 'message': f'{len(data)}개의 행을 읽었습니다.'
             })
             
+        except ValueError as e:
+            # 읽을 수 없는 형식 (HTML 내보내기, xlrd 없는 .xls 등)
+            return jsonify({'error': f'파일 읽기 실패: {str(e)}'}), 400
         except Exception as e:
             return jsonify({'error': f'파일 읽기 실패: {str(e)}'}), 500
     else:
-        return jsonify({'error': '엑셀 파일만 업로드 가능합니다.'}), 400
+        return jsonify({'error': '엑셀(.xlsx, .xls) 또는 CSV/TSV 파일만 업로드 가능합니다.'}), 400
 
 @app.route('/read_row', methods=['POST'])
 def read_row():
-    global current_row, reading
+    state = current_session()
+    file_data = state.file_data
     
     if not file_data:
         return jsonify({'error': '파일을 먼저 업로드하세요.'}), 400
     
     data = request.get_json()
-    row_num = data.get('row', current_row)
+    row_num = data.get('row', state.current_row)
     engine = data.get('engine', 'edge-tts')
     voice = data.get('voice', 'ko-KR-SunHiNeural')
     speed = data.get('speed', 1.0)
+    mode = data.get('mode', TTS_MODE)
+    prefetch_depth = data.get('prefetch')
+    with_audio = data.get('audio', True)
     
     try:
-        # 해당 행 데이터 가져오기
-        row_data = None
-        for data_row in file_data['data']:
-            if data_row['row'] == row_num:
-                row_data = data_row
-                break
-        
-        if not row_data:
-            return jsonify({'error': '해당 행을 찾을 수 없습니다.'}), 404
-        
-        # 읽을 텍스트 구성
-        text_parts = []
-        
-        # G열 (브랜드/묶음) 처리
-        g_value = clean_g_value(row_data['g'])
-        if g_value:
-            # 연속된 G값 개수 계산
-            wb = openpyxl.load_workbook(file_data['path'], data_only=True)
-            ws = wb.active
-            g_count = count_consecutive_g_values(ws, row_num)
+        # 해당 행 데이터 가져오기 (시트 부분 반영과 겹치지 않도록 세션 잠금 안에서)
+        with state.lock:
+            row_data = file_data['data'].get_row(row_num)
             
-            if g_count > 1:
-                text_parts.append(f"{g_value} {convert_quantity(g_count)}")
-            else:
-                text_parts.append(g_value)
-        
-        # 상품명, 색상, 사이즈, 수량
-        if row_data['i']:
-            text_parts.append(row_data['i'])
-        if row_data['j']:
-            text_parts.append(row_data['j'])
-        if row_data['k']:
-            text_parts.append(convert_size(row_data['k']))
-        if row_data['l'] and isinstance(row_data['l'], (int, float)) and row_data['l'] >= 2:
-            text_parts.append(convert_quantity(int(row_data['l'])))
-        
-        combined_text = " ".join(text_parts)
-        
-        if not combined_text.strip():
-            return jsonify({'error': '읽을 내용이 없습니다.'}), 400
+            if not row_data:
+                return jsonify({'error': '해당 행을 찾을 수 없습니다.'}), 404
+            
+            # 읽을 텍스트 구성
+            text_parts = file_data['composer'].parts(row_data['row'])
+            
+            combined_text = " ".join(text_parts)
+            
+            if not combined_text.strip():
+                return jsonify({'error': '읽을 내용이 없습니다.'}), 400
+            
+            state.current_row = row_num
         
         # TTS 처리
-        if engine == 'edge-tts':
+        if not with_audio:
+            # 스트리밍 재생 시 표시용 텍스트만 (오디오는 /stream_row 가 담당)
+            # 이미 캐시된 오디오가 있으면 다시 읽기 때 브라우저 캐시를 쓰도록 주소를 함께 전달
+            result = {
+                'success': True,
+                'text': combined_text,
+                'row_data': row_data
+            }
+            if engine == 'edge-tts':
+                rate = EDGE_RATE_MAP.get(str(int(speed)), "+0%")
+                result['audio_url'] = cached_row_audio(text_parts, voice, rate, mode)
+            return jsonify(result)
+        elif engine == 'edge-tts':
             # Edge TTS로 음성 생성
-            rate_map = {"1": "-25%", "2": "-15%", "3": "+0%", "4": "+15%", "5": "+25%"}
-            rate = rate_map.get(str(int(speed)), "+0%")
+            rate = EDGE_RATE_MAP.get(str(int(speed)), "+0%")
             
-            # 비동기 TTS 처리
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
+            # 공용 TTS 서비스 루프에서 합성 (워커 스레드는 결과만 기다림)
+            audio_path = tts_service.run(synthesize_row(text_parts, voice, rate, mode))
             
-            try:
-                temp_audio = os.path.join(tempfile.gettempdir(), f"tts_{uuid.uuid4().hex}.mp3")
-                comm = edge_tts.Communicate(combined_text, voice=voice, rate=rate)
-                loop.run_until_complete(comm.save(temp_audio))
-                
-                return jsonify({
-                    'success': True,
-                    'text': combined_text,
-                    'audio_url': f'/audio/{os.path.basename(temp_audio)}',
-                    'row_data': row_data
-                })
-            finally:
-                loop.close()
+            # 현재 행을 재생하는 동안 다음 행들을 미리 합성
+            with state.lock:
+                schedule_prefetch(state.prefetcher, file_data, row_num, voice, rate, mode, prefetch_depth)
+            
+            return jsonify({
+                'success': True,
+                'text': combined_text,
+                'audio_url': f'/audio/{os.path.basename(audio_path)}',
+                'row_data': row_data
+            })
         else:
             # 브라우저 TTS 사용
             return jsonify({
@@ -225,12 +277,144 @@ def read_row():
     except Exception as e:
         return jsonify({'error': f'TTS 처리 실패: {str(e)}'}), 500
 
+@app.route('/read_rows', methods=['POST'])
+def read_rows():
+    # 여러 행을 한 번에: 행마다 읽을 문장, 행 데이터, 오디오 주소를 반환
+    # 오디오는 캐시에 있으면 /audio 주소, 없으면 재생 시 합성되는 /stream_row 주소
+    state = current_session()
+    file_data = state.file_data
+    
+    if not file_data:
+        return jsonify({'error': '파일을 먼저 업로드하세요.'}), 400
+    
+    data = request.get_json(silent=True) or {}
+    try:
+        start = int(data.get('start', state.current_row))
+        count = min(int(data.get('count', 20)), MAX_BATCH_ROWS)
+        speed = str(int(data.get('speed', 3)))
+    except (TypeError, ValueError):
+        return jsonify({'error': '행 범위 또는 속도가 올바르지 않습니다.'}), 400
+    engine = data.get('engine', 'edge-tts')
+    voice = data.get('voice', 'ko-KR-SunHiNeural')
+    mode = data.get('mode', TTS_MODE)
+    rate = EDGE_RATE_MAP.get(speed, "+0%")
+    
+    rows = []
+    with state.lock:
+        end = min(start + max(count, 0), file_data['max_row'] + 1)
+        for row_num in range(max(start, 2), end):
+            row_data = file_data['data'].get_row(row_num)
+            if not row_data:
+                continue
+            text_parts = file_data['composer'].parts(row_num)
+            combined_text = " ".join(text_parts)
+            item = {'row': row_num, 'text': combined_text, 'row_data': row_data}
+            if engine == 'edge-tts' and combined_text.strip():
+                item['audio_url'] = cached_row_audio(text_parts, voice, rate, mode) or \
+                    '/stream_row?' + urlencode({'row': row_num, 'voice': voice, 'speed': speed, 'mode': mode})
+            rows.append(item)
+        
+        # 돌려준 범위는 클라이언트가 곧 재생하므로 미리 합성
+        if engine == 'edge-tts' and data.get('prefetch', True):
+            schedule_prefetch(state.prefetcher, file_data, start - 1, voice, rate, mode, len(rows))
+        max_row = file_data['max_row']
+    
+    return jsonify({
+        'success': True,
+        'start': start,
+        'rows': rows,
+        'max_row': max_row
+    })
+
+@app.route('/stream_row')
+def stream_row():
+    # 합성되는 대로 MP3 조각을 바로 전송 (chunked). <audio src> 로 직접 재생 가능
+    state = current_session()
+    file_data = state.file_data
+    
+    if not file_data:
+        return jsonify({'error': '파일을 먼저 업로드하세요.'}), 400
+    
+    row_num = request.args.get('row', state.current_row, type=int)
+    voice = request.args.get('voice', 'ko-KR-SunHiNeural')
+    rate = EDGE_RATE_MAP.get(request.args.get('speed', '3'), "+0%")
+    mode = request.args.get('mode', TTS_MODE)
+    prefetch_depth = request.args.get('prefetch', type=int)
+    
+    with state.lock:
+        row_data = file_data['data'].get_row(row_num)
+        if not row_data:
+            return jsonify({'error': '해당 행을 찾을 수 없습니다.'}), 404
+        
+        text_parts = file_data['composer'].parts(row_num)
+        combined_text = " ".join(text_parts)
+        if not combined_text.strip():
+            return jsonify({'error': '읽을 내용이 없습니다.'}), 400
+        
+        state.current_row = row_num
+    
+    def prefetch_next():
+        with state.lock:
+            schedule_prefetch(state.prefetcher, file_data, row_num, voice, rate, mode, prefetch_depth)
+    
+    # 이미 캐시에 있으면 캐시 가능한 /audio 주소로 보냄 (브라우저 캐시/Range 활용)
+    cached_url = cached_row_audio(text_parts, voice, rate, mode)
+    if cached_url:
+        prefetch_next()
+        return redirect(cached_url)
+    
+    chunks = queue.Queue()
+    
+    async def pump():
+        try:
+            key = (mode, tuple(text_parts), voice, rate)
+            if mode == 'fragments' or tts_service.running(key):
+                # 조각 합성이나 이미 진행 중인 미리 합성은 완성된 파일을 전송
+                path = await synthesize_row(text_parts, voice, rate, mode)
+                with open(path, 'rb') as f:
+                    for chunk in iter(lambda: f.read(STREAM_CHUNK), b''):
+                        chunks.put_nowait(chunk)
+            else:
+                await audio_cache.stream_to(combined_text, voice, rate, chunks.put_nowait)
+        except Exception as e:
+            chunks.put_nowait(e)
+        finally:
+            chunks.put_nowait(None)
+    
+    tts_service.submit(pump())
+    prefetch_next()
+    
+    # 첫 조각까지만 기다렸다가 응답 시작 (그 전에 실패하면 JSON 오류)
+    try:
+        first = chunks.get(timeout=DEFAULT_TIMEOUT)
+    except queue.Empty:
+        return jsonify({'error': 'TTS 처리 실패: 시간 초과'}), 504
+    if isinstance(first, Exception):
+        return jsonify({'error': f'TTS 처리 실패: {str(first)}'}), 500
+    
+    def generate():
+        chunk = first
+        while chunk is not None and not isinstance(chunk, Exception):
+            yield chunk
+            try:
+                chunk = chunks.get(timeout=DEFAULT_TIMEOUT)
+            except queue.Empty:
+                break
+    
+    return Response(generate(), mimetype='audio/mpeg', headers={'Cache-Control': 'no-store'})
+
 @app.route('/audio/<filename>')
 def serve_audio(filename):
     try:
-        audio_path = os.path.join(tempfile.gettempdir(), filename)
-        if os.path.exists(audio_path):
-            return send_file(audio_path, as_attachment=False)
+        # 오디오 캐시가 관리하는 파일만 전송
+        # 강한 ETag + 장기 캐시 + 조건부 GET(304) + Range(206) 지원
+        if audio_cache.contains_file(filename):
+            response = send_from_directory(
+                audio_cache.directory, filename, as_attachment=False,
+                etag=audio_cache.etag_for(filename), max_age=AUDIO_MAX_AGE, conditional=True)
+            response.cache_control.public = True
+            response.cache_control.immutable = True
+            return response
         else:
             return jsonify({'error': '오디오 파일을 찾을 수 없습니다.'}), 404
     except Exception as e:
@@ -238,19 +422,19 @@ def serve_audio(filename):
 
 @app.route('/search_naver', methods=['POST'])
 def search_naver():
+    state = current_session()
+    file_data = state.file_data
+    
     if not file_data:
         return jsonify({'error': '파일을 먼저 업로드하세요.'}), 400
     
     data = request.get_json()
-    row_num = data.get('row', current_row)
+    row_num = data.get('row', state.current_row)
     
     try:
         # 해당 행 데이터 찾기
-        row_data = None
-        for data_row in file_data['data']:
-            if data_row['row'] == row_num:
-                row_data = data_row
-                break
+        with state.lock:
+            row_data = file_data['data'].get_row(row_num)
         
         if not row_data:
             return jsonify({'error': '해당 행을 찾을 수 없습니다.'}), 404
@@ -272,9 +456,72 @@ def search_naver():
     except Exception as e:
         return jsonify({'error': f'검색 실패: {str(e)}'}), 500
 
+@app.route('/tts_cache_stats')
+def tts_cache_stats():
+    # 통계 조회(모니터링 등)는 세션을 새로 만들지 않음. 세션이 있을 때만 그 세션의 미리 합성 수치 포함
+    state = sessions.get(request_session_id())
+    stats = audio_cache.stats()
+    if state is not None:
+        stats['prefetch_completed'] = state.prefetcher.completed
+        stats['prefetch_cancelled'] = state.prefetcher.cancelled
+    stats['sessions'] = len(sessions)
+    return jsonify(stats)
+
+@app.route('/storage_stats')
+def storage_stats():
+    return jsonify({
+        'audio': audio_cache.stats(),
+        'reaper_runs': store_reaper.runs
+    })
+
+@app.route('/stop_prefetch', methods=['POST'])
+def stop_prefetch():
+    current_session().prefetcher.cancel()
+    return jsonify({'success': True})
+
+@app.route('/prerender', methods=['POST'])
+def start_prerender():
+    state = current_session()
+    file_data = state.file_data
+    
+    if not file_data:
+        return jsonify({'error': '파일을 먼저 업로드하세요.'}), 400
+    if state.prerender_job and state.prerender_job.progress()['running']:
+        return jsonify({'error': '이미 사전 합성이 진행 중입니다.', 'progress': state.prerender_job.progress()}), 409
+    
+    data = request.get_json(silent=True) or {}
+    voice = data.get('voice', 'ko-KR-SunHiNeural')
+    mode = data.get('mode', TTS_MODE)
+    try:
+        rate = EDGE_RATE_MAP.get(str(int(data.get('speed', 3))), "+0%")
+        concurrency = min(max(int(data.get('concurrency', DEFAULT_CONCURRENCY)), 1), MAX_PRERENDER_CONCURRENCY)
+    except (TypeError, ValueError):
+        return jsonify({'error': '속도/동시 합성 개수가 올바르지 않습니다.'}), 400
+    
+    with state.lock:
+        jobs = unique_row_jobs(file_data, lambda parts: synthesize_row(parts, voice, rate, mode))
+    job = PrerenderJob(jobs, concurrency=concurrency, cache=audio_cache)
+    if job.over_budget and not data.get('force'):
+        # 한도를 넘기면 먼저 합성한 앞쪽 행(근무 시작 때 가장 먼저 읽을 행)이 밀려남
+        return jsonify({
+            'error': f'예상 크기({job.estimated_bytes / 1e6:.1f}MB)가 오디오 캐시 한도'
+                     f'({audio_cache.max_bytes / 1e6:.1f}MB)를 넘습니다. force 로 강제할 수 있습니다.',
+            'progress': job.progress()
+        }), 409
+    state.prerender_job = job
+    tts_service.submit(job.run())
+    return jsonify({'success': True, 'progress': job.progress()})
+
+@app.route('/prerender_status')
+def prerender_status():
+    state = current_session()
+    if not state.prerender_job:
+        return jsonify({'error': '진행 중인 사전 합성이 없습니다.'}), 404
+    return jsonify(state.prerender_job.progress())
+
 @app.route('/get_voices')
 def get_voices():
     return jsonify(TTS_ENGINES)
 
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    app.run(debug=True, host='0.0.0.0', port=5000, threaded=True)
@@ -0,0 +1,305 @@
+import asyncio
+import hashlib
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from file_store import AUDIO_DIR, DEFAULT_AUDIO_MAX_AGE
+
+# TTS 오디오 디스크 캐시
+# (문장, 음성, 속도) 해시를 파일명으로 쓰는 내용 주소 방식이라,
+# 같은 문구는 한 번만 합성하고 이후에는 디스크에서 바로 꺼내 씁니다.
+# 전체 크기가 max_bytes 를 넘으면 가장 오래 안 쓴 파일부터 지웁니다(LRU).
+# max_age 동안 한 번도 쓰이지 않은 파일과 남은 .part 파일은 reap() 에서 정리합니다.
+# 다른 프로세스(예: prerender CLI)가 같은 디렉터리에 넣은 파일은 처음 찾을 때 등록합니다.
+
+DEFAULT_CACHE_DIR = AUDIO_DIR
+DEFAULT_MAX_BYTES = int(os.environ.get('TTS_CACHE_MB', '256')) * 1024 * 1024
+AUDIO_EXT = '.mp3'
+FRAGMENT_SEP = '\x1f'  # 조각 목록을 하나의 캐시 키로 묶을 때 쓰는 구분자
+STREAM_CHUNK = 16 * 1024
+PART_MAX_AGE = 600  # 합성 도중 중단되어 남은 .part 파일 보관 시간(초)
+
+# 화면의 속도(1~5) -> Edge TTS rate
+EDGE_RATE_MAP = {"1": "-25%", "2": "-15%", "3": "+0%", "4": "+15%", "5": "+25%"}
+
+# 합성 방식: 'sentence' (행 전체를 한 번에) | 'fragments' (조각별 합성 후 이어 붙이기)
+TTS_MODE = os.environ.get('TTS_MODE', 'sentence')
+
+
+async def edge_tts_synthesize(text, voice, rate, out_path):
+    import edge_tts
+    comm = edge_tts.Communicate(text, voice=voice, rate=rate)
+    await comm.save(out_path)
+
+
+async def edge_tts_stream(text, voice, rate):
+    # 합성되는 대로 MP3 조각을 내보냄
+    import edge_tts
+    comm = edge_tts.Communicate(text, voice=voice, rate=rate)
+    async for chunk in comm.stream():
+        if chunk['type'] == 'audio':
+            yield chunk['data']
+
+
+def cache_key(text, voice, rate):
+    raw = f"{voice}\0{rate}\0{text}".encode('utf-8')
+    return hashlib.sha256(raw).hexdigest()
+
+
+def fragments_text(parts):
+    # 조각 합성 결과의 캐시 키로 쓰는 텍스트 (조각이 하나면 그 조각 자체)
+    return FRAGMENT_SEP.join(p for p in parts if p)
+
+
+class AudioCache:
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES,
+                 synthesize=edge_tts_synthesize, stream_synthesize=None,
+                 max_age=DEFAULT_AUDIO_MAX_AGE):
+        # synthesize(text, voice, rate, out_path): 코루틴. 테스트 등에서는 대체 백엔드를 넘길 수 있음
+        # stream_synthesize(text, voice, rate): 오디오 조각을 내보내는 async generator (없으면 파일 합성 후 전송)
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.synthesize = synthesize
+        if stream_synthesize is None and synthesize is edge_tts_synthesize:
+            stream_synthesize = edge_tts_stream
+        self.stream_synthesize = stream_synthesize
+        self._entries = OrderedDict()  # key -> 파일 크기 (뒤쪽일수록 최근 사용)
+        self._used = {}                # key -> 마지막 사용 시각
+        self._etags = {}               # key -> 파일 내용 해시 (HTTP ETag)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.reaped = 0
+        self.discarded = 0
+        os.makedirs(directory, exist_ok=True)
+        self._scan()
+
+    def _scan(self):
+        # 재시작 시 기존 파일을 최근 사용 순서대로 다시 등록
+        found = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(AUDIO_EXT):
+                continue
+            try:
+                st = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            found.append((st.st_mtime, name[:-len(AUDIO_EXT)], st.st_size))
+        for used, key, size in sorted(found):
+            self._entries[key] = size
+            self._used[key] = used
+            self._bytes += size
+        self._evict()
+
+    def path_for(self, key):
+        return os.path.join(self.directory, key + AUDIO_EXT)
+
+    def _adopt_locked(self, key):
+        # 색인에 없는 key 의 파일이 디스크에 있으면 등록 (다른 프로세스가 합성한 파일). 등록했으면 True
+        try:
+            st = os.stat(self.path_for(key))
+        except OSError:
+            return False
+        self._entries[key] = st.st_size
+        self._used[key] = time.time()
+        self._bytes += st.st_size
+        self._evict(keep=key)
+        return True
+
+    def get(self, text, voice, rate):
+        key = cache_key(text, voice, rate)
+        path = self.path_for(key)
+        with self._lock:
+            if key not in self._entries:
+                self._adopt_locked(key)
+            if key in self._entries and os.path.exists(path):
+                self._entries.move_to_end(key)
+                self._used[key] = time.time()
+                self.hits += 1
+                try:
+                    os.utime(path)
+                except OSError:
+                    pass
+                return path
+            if key in self._entries:
+                # 다른 프로세스가 지운 파일
+                self._bytes -= self._entries.pop(key)
+                self._used.pop(key, None)
+            self.misses += 1
+        return None
+
+    def peek(self, text, voice, rate):
+        # 통계/사용 순서를 바꾸지 않고 캐시에 있는지만 확인
+        key = cache_key(text, voice, rate)
+        with self._lock:
+            if key in self._entries or self._adopt_locked(key):
+                return self.path_for(key)
+        return None
+
+    def etag_for(self, filename):
+        # 파일 내용의 sha256 (강한 ETag). 처음 요청될 때 한 번만 계산
+        key = filename[:-len(AUDIO_EXT)]
+        with self._lock:
+            etag = self._etags.get(key)
+        if etag is None:
+            with open(self.path_for(key), 'rb') as f:
+                etag = hashlib.sha256(f.read()).hexdigest()
+            with self._lock:
+                if key in self._entries:
+                    self._etags[key] = etag
+        return etag
+
+    def put_file(self, key, src_path):
+        # 합성이 끝난 임시 파일을 캐시에 원자적으로 넣음
+        path = self.path_for(key)
+        os.replace(src_path, path)
+        size = os.path.getsize(path)
+        with self._lock:
+            self._bytes -= self._entries.pop(key, 0)
+            self._etags.pop(key, None)
+            self._entries[key] = size
+            self._used[key] = time.time()
+            self._bytes += size
+            self._evict(keep=key)
+        return path
+
+    def _evict(self, keep=None):
+        while self._bytes > self.max_bytes and self._entries:
+            key, size = next(iter(self._entries.items()))
+            if key == keep:
+                break
+            self._drop(key)
+            self.evictions += 1
+
+    def _drop(self, key):
+        self._bytes -= self._entries.pop(key)
+        self._used.pop(key, None)
+        self._etags.pop(key, None)
+        try:
+            os.remove(self.path_for(key))
+        except OSError:
+            pass
+
+    def discard(self, text, voice, rate):
+        # 더 이상 읽지 않는 문장의 오디오 삭제 (시트가 수정되어 문장이 바뀐 경우). 지웠으면 True
+        key = cache_key(text, voice, rate)
+        with self._lock:
+            if key not in self._entries:
+                return False
+            self._drop(key)
+            self.discarded += 1
+        return True
+
+    def contains_file(self, filename):
+        # /audio 로 요청된 파일명이 이 캐시가 관리하는 파일인지
+        if not filename.endswith(AUDIO_EXT):
+            return False
+        key = filename[:-len(AUDIO_EXT)]
+        if len(key) != 64 or not all(c in '0123456789abcdef' for c in key):
+            # 캐시 키(sha256 hex) 형식이 아니면 디스크를 찾아보지도 않음
+            return False
+        with self._lock:
+            return key in self._entries or self._adopt_locked(key)
+
+    def reap(self, now=None):
+        # max_age 동안 안 쓴 항목과 오래된 .part 파일 정리 (StoreReaper 가 주기적으로 호출)
+        now = time.time() if now is None else now
+        removed = 0
+        with self._lock:
+            if self.max_age:
+                for key in list(self._entries):
+                    if now - self._used.get(key, now) <= self.max_age:
+                        break  # 앞쪽이 가장 오래 안 쓴 항목이므로 여기서부터는 모두 최근
+                    self._drop(key)
+                    removed += 1
+            self.reaped += removed
+        for name in os.listdir(self.directory):
+            if not name.endswith('.part'):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                if now - os.stat(path).st_mtime > PART_MAX_AGE:
+                    os.remove(path)
+            except OSError:
+                pass
+        return removed
+
+    async def get_or_synthesize(self, text, voice, rate):
+        path = self.get(text, voice, rate)
+        if path:
+            return path
+        key = cache_key(text, voice, rate)
+        tmp_path = os.path.join(self.directory, f"{key}.{uuid.uuid4().hex}.part")
+        try:
+            await self.synthesize(text, voice, rate, tmp_path)
+            return self.put_file(key, tmp_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    async def get_or_synthesize_fragments(self, parts, voice, rate):
+        # 문장 조각(브랜드, 상품명, 색상, 사이즈, 수량)을 각각 합성/캐시한 뒤 이어 붙임
+        # edge-tts 출력은 같은 형식의 MP3 프레임이라 그대로 이어 붙여도 재생됩니다.
+        parts = [p for p in parts if p]
+        if len(parts) == 1:
+            return await self.get_or_synthesize(parts[0], voice, rate)
+        joined = fragments_text(parts)
+        path = self.get(joined, voice, rate)
+        if path:
+            return path
+        paths = await asyncio.gather(*(self.get_or_synthesize(p, voice, rate) for p in parts))
+        key = cache_key(joined, voice, rate)
+        tmp_path = os.path.join(self.directory, f"{key}.{uuid.uuid4().hex}.part")
+        try:
+            with open(tmp_path, 'wb') as out:
+                for part_path in paths:
+                    with open(part_path, 'rb') as f:
+                        out.write(f.read())
+            return self.put_file(key, tmp_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    async def stream_to(self, text, voice, rate, on_chunk):
+        # 캐시에 있으면 파일을 조각내 보내고, 없으면 합성되는 대로 on_chunk 로 넘기면서 캐시에도 저장
+        path = self.get(text, voice, rate)
+        if path is None and self.stream_synthesize is None:
+            path = await self.get_or_synthesize(text, voice, rate)
+        if path:
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(STREAM_CHUNK), b''):
+                    on_chunk(chunk)
+            return path
+        key = cache_key(text, voice, rate)
+        tmp_path = os.path.join(self.directory, f"{key}.{uuid.uuid4().hex}.part")
+        try:
+            with open(tmp_path, 'wb') as out:
+                async for chunk in self.stream_synthesize(text, voice, rate):
+                    out.write(chunk)
+                    on_chunk(chunk)
+            return self.put_file(key, tmp_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'reaped': self.reaped,
+                'discarded': self.discarded,
+                'max_age': self.max_age,
+                'hit_rate': round(self.hits / total, 3) if total else 0.0
+            }
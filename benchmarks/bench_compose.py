@@ -0,0 +1,81 @@
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from row_composer import SIZE_DICT, KOREAN_NUMBER_MAP, RowComposer  # noqa: E402
+from row_store import RowStore  # noqa: E402
+from sheet_index import GRunIndex  # noqa: E402
+from synthetic_sheet import make_rows  # noqa: E402
+
+# 행 -> 문장 구성 속도 (행/초)
+# 예전 방식: 행마다 dict 를 만들고 정규식/사이즈/수량 변환을 매번 수행
+# RowComposer: 고유값 단위 변환표 조회 (행 단위 parts(), 시트 전체 sentences())
+
+
+def legacy_compose(row_data, g_index):
+    text_parts = []
+    g_value = re.sub(r"\(.*?\)", "", row_data['g']).strip()
+    if g_value:
+        g_count = g_index.count_from(row_data['row'])
+        if g_count > 1:
+            text_parts.append(f"{g_value} {KOREAN_NUMBER_MAP.get(g_count, f'{g_count}개')}")
+        else:
+            text_parts.append(g_value)
+    if row_data['i']:
+        text_parts.append(row_data['i'])
+    if row_data['j']:
+        text_parts.append(row_data['j'])
+    if row_data['k']:
+        text_parts.append(SIZE_DICT.get(str(row_data['k']).upper(), row_data['k']))
+    if row_data['l'] and isinstance(row_data['l'], (int, float)) and row_data['l'] >= 2:
+        n = int(row_data['l'])
+        text_parts.append(KOREAN_NUMBER_MAP.get(n, f"{n}개"))
+    return text_parts
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=100000)
+    args = parser.parse_args()
+
+    data = RowStore(first_row=2)
+    for row in make_rows(args.rows):
+        data.append(*row)
+
+    def legacy():
+        g_index = GRunIndex([re.sub(r"\(.*?\)", "", g).strip() for g in data.column('g')], first_row=2)
+        return [" ".join(legacy_compose(data.get_row(row), g_index)) for row in range(2, data.max_row + 1)]
+
+    def per_row():
+        composer = RowComposer(data)
+        return [composer.sentence(row) for row in range(2, data.max_row + 1)]
+
+    def whole_sheet():
+        return RowComposer(data).sentences()
+
+    expected, legacy_time = timed(legacy)
+    rows_result, per_row_time = timed(per_row)
+    sheet_result, sheet_time = timed(whole_sheet)
+    assert rows_result == expected
+    assert sheet_result == expected
+
+    print(f"rows={args.rows}")
+    for name, elapsed in (("legacy per-row   ", legacy_time),
+                          ("RowComposer.parts", per_row_time),
+                          ("RowComposer.sheet", sheet_time)):
+        print(f"{name}: {elapsed * 1000:7.1f} ms  {args.rows / elapsed:>10,.0f} rows/s"
+              f"  ({legacy_time / elapsed:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+import argparse
+import csv
+import io
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from row_store import COLUMNS  # noqa: E402
+from sheet_loader import load_delimited_rows, load_rows  # noqa: E402
+from synthetic_sheet import make_rows, make_workbook_bytes  # noqa: E402
+
+# 같은 데이터의 업로드 파싱 비교: 엑셀(openpyxl read_only) vs CSV/TSV(csv 모듈 스트리밍)
+# CSV 는 WMS 내보내기처럼 A~F 잡열 + G~L열, 1행 헤더. 인코딩은 자동 감지(UTF-8/CP949)
+
+
+def make_delimited_bytes(n_rows, delimiter=',', encoding='utf-8', extra_columns=0):
+    buf = io.StringIO(newline='')
+    writer = csv.writer(buf, delimiter=delimiter)
+    writer.writerow([f"COL{c}" for c in range(1, 7)] + ["G", "H", "I", "J", "K", "L"]
+                    + [f"EXTRA{c}" for c in range(extra_columns)])
+    for row in make_rows(n_rows):
+        writer.writerow(["", "", "", "", "", ""] + list(row) + ["x"] * extra_columns)
+    return buf.getvalue().encode(encoding)
+
+
+def measure(fn, content):
+    tracemalloc.start()
+    start = time.perf_counter()
+    data, _ = fn(io.BytesIO(content))
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return data, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--extra-columns', type=int, default=28)
+    args = parser.parse_args()
+
+    inputs = [
+        ('xlsx', load_rows, make_workbook_bytes(args.rows, extra_columns=args.extra_columns)),
+        ('csv utf-8', load_delimited_rows, make_delimited_bytes(args.rows, extra_columns=args.extra_columns)),
+        ('csv cp949', load_delimited_rows,
+         make_delimited_bytes(args.rows, encoding='cp949', extra_columns=args.extra_columns)),
+        ('tsv utf-8', load_delimited_rows,
+         make_delimited_bytes(args.rows, delimiter='\t', extra_columns=args.extra_columns)),
+    ]
+    print(f"rows={args.rows} columns={12 + args.extra_columns}")
+    expected = None
+    base_time = None
+    for name, fn, content in inputs:
+        data, elapsed, peak = measure(fn, content)
+        columns = [list(data.column(c)) for c in COLUMNS]
+        if expected is None:
+            expected, base_time = columns, elapsed
+        assert columns == expected, f"{name}: 엑셀과 행 모델이 다름"
+        print(f"{name:10s} size={len(content) / 1e6:5.1f} MB rows={len(data)} time={elapsed:.2f}s"
+              f" peak={peak / 1e6:.1f} MB  ({base_time / elapsed:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
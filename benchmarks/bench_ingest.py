@@ -0,0 +1,59 @@
+import argparse
+import io
+import os
+import sys
+import time
+import tracemalloc
+
+import openpyxl
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sheet_loader import load_rows  # noqa: E402
+from synthetic_sheet import make_workbook_bytes  # noqa: E402
+
+# 업로드 파싱 비교: 전체 load_workbook + ws.cell() vs read_only 스트리밍 (G~L열만)
+
+
+def load_rows_full(source):
+    wb = openpyxl.load_workbook(source, data_only=True)
+    ws = wb.active
+    data = []
+    for row in range(2, ws.max_row + 1):
+        data.append({
+            'row': row,
+            'g': str(ws.cell(row=row, column=7).value or "").strip(),
+            'h': str(ws.cell(row=row, column=8).value or "").strip(),
+            'i': str(ws.cell(row=row, column=9).value or "").strip(),
+            'j': str(ws.cell(row=row, column=10).value or "").strip(),
+            'k': str(ws.cell(row=row, column=11).value or "").strip(),
+            'l': ws.cell(row=row, column=12).value
+        })
+    return data, ws.max_row
+
+
+def measure(fn, content):
+    tracemalloc.start()
+    start = time.perf_counter()
+    data, _ = fn(io.BytesIO(content))
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return len(data), elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--extra-columns', type=int, default=28)
+    args = parser.parse_args()
+
+    content = make_workbook_bytes(args.rows, extra_columns=args.extra_columns)
+    print(f"rows={args.rows} columns={12 + args.extra_columns} size={len(content) / 1e6:.1f} MB")
+    for name, fn in (('full', load_rows_full), ('streaming', load_rows)):
+        n, elapsed, peak = measure(fn, content)
+        print(f"{name:10s} rows={n} time={elapsed:.2f}s peak={peak / 1e6:.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
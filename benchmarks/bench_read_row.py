@@ -0,0 +1,76 @@
+import argparse
+import io
+import os
+import sys
+import tempfile
+import time
+
+import openpyxl
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app  # noqa: E402
+from row_composer import clean_g_value  # noqa: E402
+from synthetic_sheet import make_workbook_bytes  # noqa: E402
+
+# /read_row 행당 지연시간 비교
+#   before: 행마다 load_workbook + G열 연속 개수 스캔 (기존 방식)
+#   after : 업로드 시 만든 메모리 모델만 사용 (브라우저 TTS 모드로 합성 시간 제외)
+
+
+def count_consecutive_g_values(ws, start_row):
+    current_g = clean_g_value(str(ws.cell(row=start_row, column=7).value or ""))
+    count = 0
+    for row in range(start_row, ws.max_row + 1):
+        if clean_g_value(str(ws.cell(row=row, column=7).value or "")) == current_g:
+            count += 1
+        else:
+            break
+    return count
+
+
+def bench_before(path, rows):
+    start = time.perf_counter()
+    for row in rows:
+        wb = openpyxl.load_workbook(path, data_only=True)
+        count_consecutive_g_values(wb.active, row)
+    return (time.perf_counter() - start) / len(rows)
+
+
+def bench_after(content, rows):
+    client = app.app.test_client()
+    res = client.post('/upload', data={'file': (io.BytesIO(content), 'bench.xlsx')},
+                      content_type='multipart/form-data')
+    assert res.status_code == 200, res.get_json()
+    start = time.perf_counter()
+    for row in rows:
+        res = client.post('/read_row', json={'row': row, 'engine': 'browser-tts'})
+        assert res.status_code == 200, res.get_json()
+    return (time.perf_counter() - start) / len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--samples', type=int, default=20)
+    args = parser.parse_args()
+
+    content = make_workbook_bytes(args.rows)
+    rows = list(range(2, args.rows + 2, max(1, args.rows // args.samples)))[:args.samples]
+
+    fd, path = tempfile.mkstemp(suffix='.xlsx')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(content)
+    try:
+        before = bench_before(path, rows)
+    finally:
+        os.remove(path)
+    after = bench_after(content, rows)
+
+    print(f"rows={args.rows} samples={len(rows)}")
+    print(f"before: {before * 1000:.2f} ms/row")
+    print(f"after : {after * 1000:.3f} ms/row  ({before / after:.0f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+import argparse
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from row_store import RowStore  # noqa: E402
+from synthetic_sheet import make_rows  # noqa: E402
+
+# 세션당 행 모델 메모리 비교: 행마다 dict vs 열 단위 RowStore
+# 엑셀에서 읽은 것처럼 셀마다 별도 문자열 객체를 만들어서 측정
+
+
+def fresh(value):
+    return ''.join(list(value)) if isinstance(value, str) else value
+
+
+def build_dicts(rows):
+    data = []
+    for offset, (g, h, i, j, k, l) in enumerate(rows):
+        data.append({'row': offset + 2, 'g': fresh(g), 'h': fresh(h), 'i': fresh(i),
+                     'j': fresh(j), 'k': fresh(k), 'l': l})
+    return data
+
+
+def build_store(rows):
+    data = RowStore(first_row=2)
+    for g, h, i, j, k, l in rows:
+        data.append(fresh(g), fresh(h), fresh(i), fresh(j), fresh(k), l)
+    return data
+
+
+def measure(fn, rows):
+    tracemalloc.start()
+    data = fn(rows)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return data, size
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=50000)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    dicts, dict_size = measure(build_dicts, rows)
+    store, store_size = measure(build_store, rows)
+    assert list(store) == dicts
+
+    print(f"rows={args.rows}")
+    print(f"list of dicts: {dict_size / 1e6:.1f} MB ({dict_size / args.rows:.0f} B/row)")
+    print(f"RowStore     : {store_size / 1e6:.1f} MB ({store_size / args.rows:.0f} B/row)"
+          f"  ({dict_size / store_size:.0f}x smaller)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+import argparse
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from row_composer import compose_sheet  # noqa: E402
+from row_store import RowStore  # noqa: E402
+from sheet_loader import load_rows  # noqa: E402
+from synthetic_sheet import make_rows, make_workbook_bytes  # noqa: E402
+from vector_composer import compose_frame, load_frame  # noqa: E402
+
+# 시트 전체 문장 구성: 행 단위 엔진(python) vs pandas/NumPy 벡터 엔진(numpy)
+# --xlsx 를 주면 엑셀 파싱(load_rows / load_frame)까지 포함해서 비교
+
+
+def best_of(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--xlsx', action='store_true', help="엑셀 파싱 시간 포함")
+    args = parser.parse_args()
+
+    print(f"rows={args.rows}")
+    data = RowStore(first_row=2)
+    for row in make_rows(args.rows):
+        data.append(*row)
+
+    for sequential in (False, True):
+        python_result, python_time = best_of(
+            lambda: compose_sheet(data, sequential=sequential, engine='python'), args.repeat)
+        numpy_result, numpy_time = best_of(
+            lambda: compose_sheet(data, sequential=sequential, engine='numpy'), args.repeat)
+        assert python_result == numpy_result
+        label = "sequential" if sequential else "every row"
+        print(f"[{label:10}] python {python_time * 1000:7.1f} ms ({args.rows / python_time:>9,.0f} rows/s)"
+              f" | numpy {numpy_time * 1000:7.1f} ms ({args.rows / numpy_time:>9,.0f} rows/s)"
+              f"  {python_time / numpy_time:.1f}x")
+
+    if args.xlsx:
+        content = make_workbook_bytes(args.rows)
+
+        def python_path():
+            rows, _ = load_rows(io.BytesIO(content))
+            return compose_sheet(rows, engine='python')
+
+        def numpy_path():
+            return compose_frame(load_frame(io.BytesIO(content))).tolist()
+
+        python_result, python_time = best_of(python_path, 1)
+        numpy_result, numpy_time = best_of(numpy_path, 1)
+        assert python_result == numpy_result
+        print(f"[xlsx+compose] python {python_time:.2f} s | numpy {numpy_time:.2f} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+import argparse
+import io
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app  # noqa: E402
+from synthetic_sheet import make_rows, make_workbook_bytes  # noqa: E402
+
+# 세션 분리 동시성 부하 테스트
+# 피커마다 서로 다른 시트를 올리고 동시에 한 행씩 읽으면서,
+# 응답이 항상 자기 시트의 행인지 확인합니다 (브라우저 TTS 모드로 합성 시간 제외).
+
+
+def picker(seed, n_rows, latencies, errors):
+    client = app.app.test_client()
+    content = make_workbook_bytes(n_rows, seed=seed)
+    expected = make_rows(n_rows, seed=seed)
+    res = client.post('/upload', data={'file': (io.BytesIO(content), f'p{seed}.xlsx')},
+                      content_type='multipart/form-data')
+    if res.status_code != 200:
+        errors.append(f"picker {seed}: upload {res.status_code}")
+        return
+    for offset, row in enumerate(expected):
+        start = time.perf_counter()
+        res = client.post('/read_row', json={'row': offset + 2, 'engine': 'browser-tts'})
+        latencies.append(time.perf_counter() - start)
+        body = res.get_json()
+        if res.status_code != 200 or body['row_data']['i'] != row[2] or body['row_data']['h'] != row[1]:
+            errors.append(f"picker {seed}: row {offset + 2} mismatch")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--pickers', type=int, default=30)
+    parser.add_argument('--rows', type=int, default=200)
+    args = parser.parse_args()
+
+    latencies, errors = [], []
+    threads = [threading.Thread(target=picker, args=(seed, args.rows, latencies, errors))
+               for seed in range(args.pickers)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    n = len(latencies)
+    print(f"pickers={args.pickers} rows={args.rows} sessions={len(app.sessions)}")
+    print(f"requests={n} in {elapsed:.2f}s ({n / elapsed:.0f} req/s)")
+    if n:
+        print(f"p50={latencies[n // 2] * 1000:.2f} ms  p95={latencies[int(n * 0.95)] * 1000:.2f} ms")
+    print(f"cross-session errors={len(errors)}")
+    for err in errors[:10]:
+        print("  " + err)
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,40 @@
+import io
+import random
+
+import openpyxl
+
+# 벤치마크용 가상 피킹 시트 생성 (A~F는 ERP 잡열, G~L은 실제 읽는 열)
+BRANDS = ["나이키(본사)", "아디다스", "뉴발란스(직배)", "푸마", "리복"]
+PRODUCTS = ["반팔티", "후드티", "조거팬츠", "바람막이", "양말", "캡모자"]
+COLORS = ["블랙", "화이트", "네이비", "그레이", "베이지"]
+SIZES = ["XS", "S", "M", "L", "XL", "XXL", "FREE", "JS", "JM", "JL"]
+
+
+def make_rows(n_rows, max_run=40, seed=0):
+    rnd = random.Random(seed)
+    rows = []
+    while len(rows) < n_rows:
+        brand = rnd.choice(BRANDS)
+        for _ in range(rnd.randint(1, max_run)):
+            rows.append((
+                brand,
+                f"H{rnd.randint(1000, 9999)}",
+                rnd.choice(PRODUCTS),
+                rnd.choice(COLORS),
+                rnd.choice(SIZES),
+                rnd.randint(1, 12),
+            ))
+    return rows[:n_rows]
+
+
+def make_workbook_bytes(n_rows, extra_columns=0, max_run=40, seed=0):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    header = [f"COL{c}" for c in range(1, 7)] + ["G", "H", "I", "J", "K", "L"]
+    header += [f"EXTRA{c}" for c in range(extra_columns)]
+    ws.append(header)
+    for row in make_rows(n_rows, max_run=max_run, seed=seed):
+        ws.append(["", "", "", "", "", ""] + list(row) + ["x"] * extra_columns)
+    buf = io.BytesIO()
+    wb.save(buf)
+    return buf.getvalue()
@@ -0,0 +1,43 @@
+import os
+import tempfile
+import threading
+
+# 서버가 디스크에 쓰는 임시 파일(합성 오디오) 관리
+# 모든 파일은 전용 디렉터리(STORE_ROOT) 아래에만 만들고,
+# 백그라운드 정리 스레드가 크기/보관 기간 한도를 넘은 파일을 주기적으로 지웁니다.
+
+STORE_ROOT = os.environ.get('READER_STORE_DIR',
+                            os.path.join(tempfile.gettempdir(), 'excel_voice_reader'))
+AUDIO_DIR = os.path.join(STORE_ROOT, 'audio')
+
+DEFAULT_AUDIO_MAX_AGE = int(os.environ.get('TTS_CACHE_MAX_AGE_HOURS', '72')) * 3600
+DEFAULT_REAP_INTERVAL = 300
+
+
+class StoreReaper:
+    # stores 의 reap() 를 interval 초마다 호출하는 데몬 스레드
+    def __init__(self, stores, interval=DEFAULT_REAP_INTERVAL):
+        self.stores = list(stores)
+        self.interval = interval
+        self.runs = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='store-reaper', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.reap_now()
+
+    def reap_now(self):
+        for store in self.stores:
+            try:
+                store.reap()
+            except Exception:
+                pass
+        self.runs += 1
+
+    def stop(self):
+        self._stop.set()
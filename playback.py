@@ -0,0 +1,194 @@
+import itertools
+import subprocess
+import sys
+import threading
+import time
+from concurrent import futures
+
+# 끊을 수 있는 오디오 재생 엔진 (최신 요청 우선)
+# 재생 요청은 대기열 대신 "가장 최근 요청" 한 칸만 두고, 새 요청이 오면
+# 재생 중인 클립을 바로 끊고 그 행으로 넘어갑니다. 빠르게 넘겨도 지난 행이 밀려 나오지 않습니다.
+# 합성 결과(Future)를 그대로 넘길 수 있어서, 다음 행 합성은 이전 클립이 재생되는 동안 진행됩니다.
+# Windows 에서는 playsound 와 같은 MCI(winmm)를 프로세스 안에서 직접 써서 클립마다 재생을 멈출 수 있고,
+# 그 밖의 환경에서는 playsound 를 별도 프로세스로 실행하고 끊을 때 프로세스를 종료합니다.
+# player(path) 는 done()/wait(timeout)/stop()/close() 를 가진 클립을 돌려줍니다.
+
+POLL_INTERVAL = 0.03
+
+_PLAY_SCRIPT = "import sys; from playsound import playsound; playsound(sys.argv[1])"
+
+
+class ProcessClip:
+    # playsound 를 별도 프로세스로 재생 (인터프리터 시작 비용이 있으므로 MCI 가 없을 때만)
+    def __init__(self, path):
+        self._proc = subprocess.Popen([sys.executable, '-c', _PLAY_SCRIPT, path],
+                                      stdin=subprocess.DEVNULL,
+                                      stdout=subprocess.DEVNULL,
+                                      stderr=subprocess.DEVNULL)
+
+    def done(self):
+        if self._proc.poll() is None:
+            return False
+        if self._proc.returncode:
+            raise RuntimeError(f"재생 실패 (종료 코드 {self._proc.returncode})")
+        return True
+
+    def wait(self, timeout):
+        try:
+            self._proc.wait(timeout)
+        except subprocess.TimeoutExpired:
+            pass
+
+    def stop(self):
+        if self._proc.poll() is None:
+            self._proc.terminate()
+            self._proc.wait()
+
+    def close(self):
+        self.stop()
+
+
+def _mci(command):
+    # mciSendStringW 호출, 응답 문자열 반환 (실패 시 RuntimeError)
+    import ctypes
+    winmm = ctypes.windll.winmm
+    buf = ctypes.create_unicode_buffer(256)
+    code = winmm.mciSendStringW(command, buf, len(buf), None)
+    if code:
+        err = ctypes.create_unicode_buffer(256)
+        winmm.mciGetErrorStringW(code, err, len(err))
+        raise RuntimeError(f"재생 실패: {err.value or code} ({command})")
+    return buf.value
+
+
+class MciClip:
+    # Windows MCI 로 프로세스 안에서 재생 (playsound 와 같은 방식, alias 로 멈춤/닫기 가능)
+    # MCI 장치는 연 스레드에서 다뤄야 하므로 재생 스레드에서만 사용
+    _ids = itertools.count()
+
+    def __init__(self, path):
+        self.alias = f"reader_clip{next(self._ids)}"
+        _mci(f'open "{path}" type mpegvideo alias {self.alias}')
+        try:
+            _mci(f'play {self.alias}')
+        except Exception:
+            self.close()
+            raise
+
+    def done(self):
+        return _mci(f'status {self.alias} mode') == 'stopped'
+
+    def wait(self, timeout):
+        time.sleep(timeout)
+
+    def stop(self):
+        _mci(f'stop {self.alias}')
+
+    def close(self):
+        try:
+            _mci(f'close {self.alias}')
+        except RuntimeError:
+            pass
+
+
+def process_player(path):
+    return ProcessClip(path)
+
+
+def mci_player(path):
+    return MciClip(path)
+
+
+DEFAULT_PLAYER = mci_player if sys.platform == 'win32' else process_player
+
+
+class PlaybackEngine:
+    def __init__(self, player=DEFAULT_PLAYER, name='playback'):
+        self.player = player
+        self.played = 0     # 끝까지 재생한 클립 수
+        self.cut = 0        # 재생 도중 끊은 클립 수
+        self.dropped = 0    # 재생 전에 더 새 요청에 밀려 버린 요청 수
+        self.failed = 0
+        self._cond = threading.Condition()
+        self._pending = None    # (generation, source, on_error)
+        self._generation = 0
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def play(self, source, on_error=None):
+        # source: mp3 경로 또는 경로를 돌려줄 Future. 이전 요청/재생은 모두 취소됨
+        # on_error(exc): 합성/재생 실패 시 재생 스레드에서 호출 (폴백 엔진 연결용)
+        with self._cond:
+            self._generation += 1
+            if self._pending is not None:
+                self.dropped += 1
+            self._pending = (self._generation, source, on_error)
+            self._cond.notify()
+
+    def stop(self):
+        # 재생 중인 클립을 끊고 대기 중인 요청도 버림
+        with self._cond:
+            self._generation += 1
+            if self._pending is not None:
+                self.dropped += 1
+            self._pending = None
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._generation += 1
+            self._pending = None
+            self._cond.notify()
+        self._thread.join(timeout=5)
+
+    def _stale(self, generation):
+        return generation != self._generation
+
+    def _next(self):
+        with self._cond:
+            while self._pending is None and not self._closed:
+                self._cond.wait()
+            item, self._pending = self._pending, None
+            return item
+
+    def _resolve(self, generation, source):
+        # Future 면 합성이 끝날 때까지 기다리되, 더 새 요청이 오면 포기(None)
+        if not hasattr(source, 'result'):
+            return source
+        while not source.done():
+            if self._stale(generation):
+                return None
+            futures.wait([source], POLL_INTERVAL)
+        return source.result()
+
+    def _run(self):
+        while True:
+            item = self._next()
+            if item is None:
+                return
+            generation, source, on_error = item
+            try:
+                path = self._resolve(generation, source)
+                if path is None or self._stale(generation):
+                    self.dropped += 1
+                    continue
+                clip = self.player(path)
+                try:
+                    while not clip.done():
+                        if self._stale(generation):
+                            clip.stop()
+                            self.cut += 1
+                            break
+                        clip.wait(POLL_INTERVAL)
+                    else:
+                        self.played += 1
+                finally:
+                    clip.close()
+            except Exception as e:
+                self.failed += 1
+                if on_error and not self._stale(generation):
+                    try:
+                        on_error(e)
+                    except Exception:
+                        pass
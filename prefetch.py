@@ -0,0 +1,67 @@
+import asyncio
+import itertools
+import os
+import threading
+
+from tts_service import TTSService
+
+# 다음 행 미리 합성(look-ahead prefetch)
+# 현재 행이 재생되는 동안 다음 K개 행의 오디오를 백그라운드에서 캐시에 채워 두어,
+# "다음 행" 요청이 거의 항상 캐시 적중이 되도록 합니다.
+# 새 일정이 들어오거나(행 점프) 중지하면 이전 일정은 취소됩니다.
+# 일정에 key/rows 를 붙여 두면, 진행 중인 일정이 이미 덮는 범위는 covers() 로 확인해 다시 잡지 않을 수 있습니다.
+# 합성은 공용 TTSService 루프에서 실행됩니다.
+
+DEFAULT_DEPTH = int(os.environ.get('PREFETCH_DEPTH', '3'))
+
+
+class Prefetcher:
+    def __init__(self, service=None, depth=DEFAULT_DEPTH):
+        self.depth = depth
+        self.service = service or TTSService(name='tts-prefetch')
+        self._future = None
+        self._key = None
+        self._rows = None
+        self._lock = threading.Lock()
+        self.completed = 0
+        self.cancelled = 0
+
+    async def _run(self, jobs):
+        # 가까운 행부터 차례대로 합성 (실패한 행은 건너뜀)
+        for job in jobs:
+            try:
+                await job()
+                self.completed += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                pass
+
+    def schedule(self, jobs, depth=None, key=None, rows=None):
+        # jobs: 코루틴을 돌려주는 함수 목록 (가까운 행 순서)
+        # key/rows: 이 일정의 설정(시트, 음성 등)과 미리 합성하는 행 범위(range). covers() 에서 사용
+        depth = self.depth if depth is None else depth
+        with self._lock:
+            self._cancel_locked()
+            jobs = list(itertools.islice(jobs, depth))
+            if jobs:
+                self._future = self.service.submit(self._run(jobs))
+                self._key, self._rows = key, rows
+
+    def covers(self, key, rows):
+        # 진행 중인 일정이 같은 설정으로 rows 범위를 모두 미리 합성하고 있는지
+        with self._lock:
+            active = self._future is not None and not self._future.done()
+            return (active and self._rows is not None and key == self._key
+                    and self._rows.start <= rows.start and rows.stop <= self._rows.stop)
+
+    def cancel(self):
+        with self._lock:
+            self._cancel_locked()
+
+    def _cancel_locked(self):
+        if self._future is not None and not self._future.done():
+            self._future.cancel()
+            self.cancelled += 1
+        self._future = None
+        self._key = self._rows = None
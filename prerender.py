@@ -0,0 +1,169 @@
+import argparse
+import asyncio
+import sys
+import threading
+import time
+
+# 시트 전체 오디오 일괄 사전 합성
+# 근무 시작 전에 피킹 리스트 전체를 TTS 캐시에 채워 두면 현장에서 합성을 기다릴 일이 없습니다.
+# 동시 합성 개수는 세마포어로 제한합니다. 작업은 TTSService 루프에서 실행해야 합니다.
+# 합성 함수는 호출한 쪽(app 또는 아래 CLI)이 넘기므로 이 모듈은 app 을 import 하지 않습니다.
+
+# 시트 전체가 캐시 한도(max_bytes)를 넘으면 LRU 가 먼저 합성한 앞쪽 행부터 지우므로,
+# 시작 전에 예상 크기를 한도와 비교하고 진행 중 캐시에서 밀려난 개수를 함께 보고합니다.
+
+DEFAULT_CONCURRENCY = 4
+EST_CLIP_BYTES = 12 * 1024  # 캐시가 비어 있을 때 쓰는 클립 하나의 예상 크기 (edge-tts 한 행 약 10~15KB)
+
+
+def estimate_bytes(count, cache):
+    # 클립 count 개의 예상 크기: 캐시에 있는 클립의 평균 크기(없으면 EST_CLIP_BYTES) × 개수
+    stats = cache.stats()
+    average = stats['bytes'] / stats['entries'] if stats['entries'] else EST_CLIP_BYTES
+    return int(average * count)
+
+
+class PrerenderJob:
+    def __init__(self, jobs, concurrency=DEFAULT_CONCURRENCY, cache=None):
+        # jobs: 코루틴을 돌려주는 함수 목록 (같은 문장은 미리 합쳐서 넘기는 것이 좋음)
+        # cache: 합성 결과가 들어가는 AudioCache (있으면 예상 크기/밀려난 개수를 계산)
+        self.jobs = list(jobs)
+        self.concurrency = max(1, int(concurrency))
+        self.total = len(self.jobs)
+        self.cache = cache
+        self.estimated_bytes = estimate_bytes(self.total, cache) if cache is not None else None
+        self._evictions_at_start = None
+        self.done = 0
+        self.failed = 0
+        self.started_at = None
+        self.finished_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def over_budget(self):
+        # 예상 크기가 캐시 한도를 넘는지 (넘으면 앞쪽 행이 끝나기 전에 밀려남)
+        return self.cache is not None and self.estimated_bytes > self.cache.max_bytes
+
+    def evicted(self):
+        # 작업을 시작한 뒤 캐시에서 밀려난 클립 수
+        if self.cache is None or self._evictions_at_start is None:
+            return 0
+        return self.cache.stats()['evictions'] - self._evictions_at_start
+
+    async def run(self, on_progress=None):
+        self.started_at = time.perf_counter()
+        if self.cache is not None:
+            self._evictions_at_start = self.cache.stats()['evictions']
+        sem = asyncio.Semaphore(self.concurrency)
+
+        async def render(job):
+            async with sem:
+                try:
+                    await job()
+                    ok = True
+                except Exception:
+                    ok = False
+            with self._lock:
+                if ok:
+                    self.done += 1
+                else:
+                    self.failed += 1
+            if on_progress:
+                on_progress(self)
+
+        try:
+            await asyncio.gather(*(render(job) for job in self.jobs))
+        finally:
+            self.finished_at = time.perf_counter()
+        return self.progress()
+
+    def progress(self):
+        evicted = self.evicted()
+        with self._lock:
+            finished = self.done + self.failed
+            if self.started_at is None:
+                elapsed = 0.0
+            else:
+                elapsed = (self.finished_at or time.perf_counter()) - self.started_at
+            return {
+                'total': self.total,
+                'done': self.done,
+                'failed': self.failed,
+                'running': self.finished_at is None,
+                'elapsed': round(elapsed, 2),
+                'per_second': round(finished / elapsed, 2) if elapsed else 0.0,
+                'evicted': evicted,
+                'estimated_bytes': self.estimated_bytes,
+                'max_bytes': self.cache.max_bytes if self.cache is not None else None
+            }
+
+
+def unique_row_jobs(sheet, synth):
+    # 시트의 모든 행을 문장으로 구성하고, 같은 문장은 한 번만 합성하도록 묶음
+    # synth(parts): 한 행의 문장 조각 목록을 합성하는 코루틴을 돌려주는 함수
+    seen = set()
+    jobs = []
+    for _, parts in sheet['composer'].iter_parts():
+        key = tuple(parts)
+        if not " ".join(parts).strip() or key in seen:
+            continue
+        seen.add(key)
+        jobs.append(lambda parts=parts: synth(parts))
+    return jobs
+
+
+def cache_synth(audio_cache, voice, rate, mode):
+    # app 없이 AudioCache 로 바로 합성하는 synth (CLI 용)
+    def synth(parts):
+        if mode == 'fragments':
+            return audio_cache.get_or_synthesize_fragments(parts, voice, rate)
+        return audio_cache.get_or_synthesize(" ".join(parts), voice, rate)
+    return synth
+
+
+def main(argv=None):
+    from audio_cache import AudioCache, EDGE_RATE_MAP, TTS_MODE
+    from row_composer import RowComposer
+    from sheet_loader import load_any
+    from tts_service import TTSService
+
+    parser = argparse.ArgumentParser(description="엑셀 시트 전체를 TTS 캐시에 미리 합성")
+    parser.add_argument('path', help="시트 파일 경로 (xlsx, xls, CSV, TSV)")
+    parser.add_argument('--voice', default='ko-KR-SunHiNeural')
+    parser.add_argument('--speed', default='3', choices=sorted(EDGE_RATE_MAP))
+    parser.add_argument('--mode', default=TTS_MODE, choices=['sentence', 'fragments'])
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument('--force', action='store_true', help="캐시 한도를 넘어도 합성 (앞쪽 행이 밀려날 수 있음)")
+    args = parser.parse_args(argv)
+
+    data, max_row = load_any(args.path)
+    sheet = {
+        'data': data,
+        'max_row': max_row,
+        'composer': RowComposer(data)
+    }
+    # 서버와 같은 캐시 디렉터리를 쓰므로 미리 채운 오디오를 서버가 그대로 사용
+    audio_cache = AudioCache()
+    synth = cache_synth(audio_cache, args.voice, EDGE_RATE_MAP[args.speed], args.mode)
+    job = PrerenderJob(unique_row_jobs(sheet, synth), concurrency=args.concurrency, cache=audio_cache)
+    if job.over_budget:
+        print(f"경고: 예상 크기 {job.estimated_bytes / 1e6:.1f}MB 가 캐시 한도 {audio_cache.max_bytes / 1e6:.1f}MB 를 넘습니다. "
+              f"먼저 합성한 앞쪽 행이 캐시에서 밀려납니다. (TTS_CACHE_MB 를 늘리거나 --force)")
+        if not args.force:
+            return 2
+    tts_service = TTSService(name='tts-prerender')
+    print(f"{len(data)}개 행, 고유 문장 {job.total}개 합성 시작 (동시 {job.concurrency}개)")
+
+    def report(job):
+        p = job.progress()
+        sys.stdout.write(f"\r{p['done'] + p['failed']}/{p['total']}  실패 {p['failed']}  {p['per_second']}개/초")
+        sys.stdout.flush()
+
+    result = tts_service.run(job.run(on_progress=report), timeout=None)
+    print(f"\n완료: {result['done']}개, 실패 {result['failed']}개, "
+          f"{result['elapsed']}초 ({result['per_second']}개/초), 캐시에서 밀려남 {result['evicted']}개")
+    return 0 if not result['failed'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
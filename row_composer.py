@@ -0,0 +1,178 @@
+import os
+import re
+
+from sheet_index import GRunIndex
+
+# 행 -> 읽을 문장 구성 (웹/Streamlit/데스크톱 공용)
+# G열 묶음 안내(연속 개수 포함), 상품명, 색상, 사이즈, 수량(2개 이상) 규칙을 한 곳에 둡니다.
+# 변환은 열의 고유값마다 한 번만 해 두고(RowStore 고유값 테이블 기준),
+# 행을 읽을 때는 표 조회만 하므로 행마다 정규식/딕셔너리 변환을 반복하지 않습니다.
+
+# 사이즈 변환 딕셔너리
+SIZE_DICT = {
+    "XS": "엑스스몰", "S": "스몰", "M": "미디움", "L": "라지", "FREE": "프리",
+    "XL": "엑스라지", "XXL": "투엑스라지",
+    "JS": "주니어 스몰", "JM": "주니어 미디움", "JL": "주니어 라지"
+}
+
+# 한국어 숫자 변환
+KOREAN_NUMBER_MAP = {
+    1: "한개", 2: "두개", 3: "세개", 4: "네개",
+    5: "다섯개", 6: "여섯개", 7: "일곱개",
+    8: "여덟개", 9: "아홉개", 10: "열개"
+}
+
+_PAREN_RE = re.compile(r"\(.*?\)")
+
+# 시트 전체 문장 구성 엔진: 'python'(RowComposer) 또는 'numpy'(vector_composer, pandas 필요)
+COMPOSE_ENGINE = os.environ.get('COMPOSE_ENGINE', 'python')
+
+
+def clean_g_value(text):
+    # G열 괄호 안 내용 제거
+    return _PAREN_RE.sub("", text).strip()
+
+
+def convert_size(size_code):
+    return SIZE_DICT.get(str(size_code).upper(), size_code)
+
+
+def convert_quantity(n):
+    if isinstance(n, int) and n >= 1:
+        return KOREAN_NUMBER_MAP.get(n, f"{n}개")
+    return ""
+
+
+def parse_quantity(value):
+    # L열 수량: 숫자(또는 숫자 문자열)이고 2 이상일 때만 정수, 아니면 None
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, str):
+        value = value.strip()
+        value = int(value) if value.isdigit() else None
+    if isinstance(value, (int, float)) and value >= 2:
+        return int(value)
+    return None
+
+
+def quantity_text(value):
+    # L열 값 -> 읽을 수량 문구 (읽지 않으면 "")
+    n = parse_quantity(value)
+    return convert_quantity(n) if n is not None else ""
+
+
+class RowComposer:
+    def __init__(self, data, g_index=None):
+        # data: RowStore. 업로드/파일 열기 시 한 번만 만들고 읽기마다 재사용
+        self.data = data
+        self.first_row = data.first_row
+
+        _, self._g_codes = data.table('g')
+        _, self._i_codes = data.table('i')
+        _, self._j_codes = data.table('j')
+        _, self._k_codes = data.table('k')
+        _, self._l_codes = data.table('l')
+
+        # 고유값 단위 변환표
+        self._g = []
+        self._i = []
+        self._j = []
+        self._k = []
+        self._l = []
+        self.sync()
+
+        if g_index is None:
+            g_index = GRunIndex([self._g[code] for code in self._g_codes], first_row=self.first_row)
+        self.g_index = g_index
+
+    def __len__(self):
+        return len(self._g_codes)
+
+    def sync(self):
+        # RowStore 에 새로 생긴 고유값만 변환표에 추가 (시트 일부 수정 후 호출)
+        data = self.data
+        for table, name, convert in ((self._g, 'g', lambda v: clean_g_value(str(v or ""))),
+                                     (self._i, 'i', None),
+                                     (self._j, 'j', None),
+                                     (self._k, 'k', lambda v: convert_size(v) if v else ""),
+                                     (self._l, 'l', quantity_text)):
+            values, _ = data.table(name)
+            new_values = values[len(table):]
+            table.extend(map(convert, new_values) if convert else new_values)
+
+    def _offset(self, row_num):
+        if isinstance(row_num, float) and row_num.is_integer():
+            row_num = int(row_num)
+        if not isinstance(row_num, int):
+            return None
+        offset = row_num - self.first_row
+        if offset < 0 or offset >= len(self._g_codes):
+            return None
+        return offset
+
+    def g_value(self, row_num):
+        # 정리된 G값 (행이 없으면 None)
+        offset = self._offset(row_num)
+        return None if offset is None else self._g[self._g_codes[offset]]
+
+    def quantity(self, row_num):
+        # 화면 표시용 수량 (2 이상만, 아니면 None)
+        offset = self._offset(row_num)
+        return None if offset is None else parse_quantity(self.data.value(offset, 'l'))
+
+    def _parts(self, offset, g_count, announce):
+        parts = []
+        if announce:
+            g_value = self._g[self._g_codes[offset]]
+            parts.append(f"{g_value} {convert_quantity(g_count)}" if g_count > 1 else g_value)
+        for text in (self._i[self._i_codes[offset]], self._j[self._j_codes[offset]],
+                     self._k[self._k_codes[offset]], self._l[self._l_codes[offset]]):
+            if text:
+                parts.append(text)
+        return parts
+
+    def parts(self, row_num, prev_g=None, announce_group=True):
+        # 한 행을 읽을 문장 조각 목록 (행이 없으면 None)
+        # G값은 prev_g(직전에 읽은 행의 G값)와 다를 때만 "브랜드 N개" 로 안내.
+        # prev_g 를 주지 않으면 G값이 있는 행마다 안내 (웹: 행 단위 임의 접근)
+        offset = self._offset(row_num)
+        if offset is None:
+            return None
+        g_value = self._g[self._g_codes[offset]]
+        announce = announce_group and bool(g_value) and g_value != prev_g
+        g_count = self.g_index.count_from(self.first_row + offset) if announce else 0
+        return self._parts(offset, g_count, announce)
+
+    def sentence(self, row_num, prev_g=None, announce_group=True):
+        parts = self.parts(row_num, prev_g, announce_group)
+        return None if parts is None else " ".join(parts)
+
+    def iter_parts(self, announce_group=True, sequential=False):
+        # 시트 전체를 한 번에: (행번호, 조각 목록) 을 순서대로
+        # sequential=True 면 위에서부터 차례로 읽는 경우처럼 G값이 바뀌는 행에서만 안내
+        g_index = self.g_index
+        g_table = self._g
+        g_codes = self._g_codes
+        first_row = self.first_row
+        for start, length in zip(g_index.run_starts, g_index.run_lengths):
+            g_value = g_table[g_codes[start - first_row]]
+            announce_run = announce_group and bool(g_value)
+            for position in range(length):
+                offset = start - first_row + position
+                announce = announce_run and (position == 0 or not sequential)
+                yield start + position, self._parts(offset, length - position, announce)
+
+    def sentences(self, announce_group=True, sequential=False):
+        # 시트 전체 문장 목록 (인덱스 0 = first_row)
+        return [" ".join(parts) for _, parts in self.iter_parts(announce_group, sequential)]
+
+
+def compose_sheet(data, announce_group=True, sequential=False, engine=None):
+    # RowStore -> 시트 전체 문장 목록. 두 엔진의 결과는 같고 속도만 다름
+    engine = engine or COMPOSE_ENGINE
+    if engine == 'numpy':
+        from vector_composer import compose_sentences
+        return compose_sentences(data, announce_group, sequential)
+    if engine != 'python':
+        raise ValueError(f"알 수 없는 문장 구성 엔진: {engine}")
+    return RowComposer(data).sentences(announce_group, sequential)
@@ -0,0 +1,100 @@
+from array import array
+
+# 열 단위(columnar) 행 저장소
+# 행마다 dict 를 두는 대신, 열마다 고유값 테이블 + 정수 인덱스 배열만 보관합니다.
+# 피킹 시트는 브랜드/상품/색상/사이즈/수량 값이 반복되므로 메모리가 크게 줄어듭니다.
+# 조회 시에는 기존과 같은 {'row','g','h','i','j','k','l'} dict 를 만들어 돌려줍니다.
+
+COLUMNS = ('g', 'h', 'i', 'j', 'k', 'l')
+
+
+class _Column:
+    __slots__ = ('values', 'codes', '_lookup')
+
+    def __init__(self):
+        self.values = []        # 고유값 테이블
+        self.codes = array('I')  # 행 오프셋 -> 테이블 번호
+        self._lookup = {}
+
+    def _code(self, value):
+        # 1 / 1.0 / True 가 같은 키로 합쳐지지 않도록 타입까지 키에 포함
+        key = (value.__class__, value)
+        code = self._lookup.get(key)
+        if code is None:
+            code = len(self.values)
+            self.values.append(value)
+            self._lookup[key] = code
+        return code
+
+    def append(self, value):
+        self.codes.append(self._code(value))
+
+    def get(self, offset):
+        return self.values[self.codes[offset]]
+
+
+class RowStore:
+    def __init__(self, first_row=2):
+        self.first_row = first_row
+        self._columns = {name: _Column() for name in COLUMNS}
+
+    def append(self, g, h, i, j, k, l):
+        columns = self._columns
+        columns['g'].append(g)
+        columns['h'].append(h)
+        columns['i'].append(i)
+        columns['j'].append(j)
+        columns['k'].append(k)
+        columns['l'].append(l)
+
+    def __len__(self):
+        return len(self._columns['g'].codes)
+
+    def __getitem__(self, index):
+        n = len(self)
+        if index < 0:
+            index += n
+        if index < 0 or index >= n:
+            raise IndexError('row index out of range')
+        record = {'row': self.first_row + index}
+        for name, column in self._columns.items():
+            record[name] = column.get(index)
+        return record
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def get_row(self, row_num):
+        # 엑셀 행번호로 바로 조회 (행번호는 first_row 부터 연속이므로 O(1)), 없으면 None
+        if isinstance(row_num, float) and row_num.is_integer():
+            row_num = int(row_num)
+        if not isinstance(row_num, int):
+            return None
+        index = row_num - self.first_row
+        if index < 0 or index >= len(self):
+            return None
+        return self[index]
+
+    def splice(self, lo, hi, rows):
+        # 오프셋 [lo, hi) 의 행을 rows((g, h, i, j, k, l) 목록)로 교체. 개수가 달라도 됨 (행 삽입/삭제)
+        rows = list(rows)
+        for position, column in enumerate(self._columns.values()):
+            column.codes[lo:hi] = array('I', [column._code(row[position]) for row in rows])
+
+    @property
+    def max_row(self):
+        return self.first_row + len(self) - 1
+
+    def value(self, index, name):
+        return self._columns[name].get(index)
+
+    def table(self, name):
+        # (고유값 테이블, 행 오프셋별 테이블 번호 배열). 고유값 단위로 미리 계산할 때 사용 (읽기 전용)
+        column = self._columns[name]
+        return column.values, column.codes
+
+    def column(self, name):
+        column = self._columns[name]
+        values = column.values
+        return [values[code] for code in column.codes]
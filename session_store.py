@@ -0,0 +1,109 @@
+import os
+import secrets
+import threading
+import time
+
+# 사용자(세션)별 상태 저장소
+# 업로드한 시트, 현재 행(커서), 미리 합성 일정 등을 세션 ID 별로 따로 보관해서
+# 서버 프로세스 하나로 여러 피커가 동시에 작업해도 서로의 시트를 덮어쓰지 않습니다.
+# 백엔드는 get/set/delete/sweep 만 구현하면 교체할 수 있습니다(기본: 메모리 + TTL).
+
+DEFAULT_TTL = int(os.environ.get('SESSION_TTL_MINUTES', '240')) * 60
+
+
+class SessionState:
+    def __init__(self, prefetcher=None):
+        self.file_data = None
+        self.current_row = 2
+        self.prefetcher = prefetcher
+        self.prerender_job = None
+        self.lock = threading.RLock()
+
+
+class MemorySessionBackend:
+    # 같은 프로세스 안에서만 공유되는 메모리 백엔드. 마지막 접근 후 ttl 초가 지나면 제거
+    def __init__(self, ttl=DEFAULT_TTL, clock=time.monotonic):
+        self.ttl = ttl
+        self.clock = clock
+        self._items = {}  # sid -> (마지막 접근 시각, 상태)
+        self._lock = threading.Lock()
+
+    def get(self, sid):
+        now = self.clock()
+        with self._lock:
+            item = self._items.get(sid)
+            if item is None:
+                return None
+            if now - item[0] > self.ttl:
+                del self._items[sid]
+                return None
+            self._items[sid] = (now, item[1])
+            return item[1]
+
+    def set(self, sid, state):
+        with self._lock:
+            self._items[sid] = (self.clock(), state)
+
+    def delete(self, sid):
+        with self._lock:
+            return self._items.pop(sid, (None, None))[1]
+
+    def sweep(self):
+        # 만료된 세션을 제거하고 제거된 상태 목록을 반환
+        now = self.clock()
+        with self._lock:
+            expired = [sid for sid, (seen, _) in self._items.items() if now - seen > self.ttl]
+            return [self._items.pop(sid)[1] for sid in expired]
+
+    def __len__(self):
+        with self._lock:
+            return len(self._items)
+
+
+class SessionStore:
+    def __init__(self, backend=None, on_expire=None, sweep_interval=60, state_factory=SessionState):
+        self.backend = backend if backend is not None else MemorySessionBackend()
+        self.on_expire = on_expire  # 만료된 세션 정리용 콜백 (예: 미리 합성 취소)
+        # 새 세션 상태 생성 (세션마다 한 번만, 생성 잠금 안에서 호출)
+        self.state_factory = state_factory
+        self.sweep_interval = sweep_interval
+        self._last_sweep = time.monotonic()
+        self._create_lock = threading.Lock()
+
+    @staticmethod
+    def new_id():
+        return secrets.token_urlsafe(16)
+
+    def get(self, sid):
+        self._maybe_sweep()
+        return self.backend.get(sid) if sid else None
+
+    def get_or_create(self, sid):
+        # (세션 ID, 상태) 반환. 없거나 만료된 ID 면 새 세션을 만듦
+        state = self.get(sid)
+        if state is not None:
+            return sid, state
+        with self._create_lock:
+            state = self.backend.get(sid) if sid else None
+            if state is None:
+                sid = self.new_id()
+                state = self.state_factory()
+                self.backend.set(sid, state)
+        return sid, state
+
+    def delete(self, sid):
+        state = self.backend.delete(sid)
+        if state is not None and self.on_expire:
+            self.on_expire(state)
+
+    def _maybe_sweep(self):
+        now = time.monotonic()
+        if now - self._last_sweep < self.sweep_interval:
+            return
+        self._last_sweep = now
+        for state in self.backend.sweep():
+            if self.on_expire:
+                self.on_expire(state)
+
+    def __len__(self):
+        return len(self.backend)
@@ -0,0 +1,88 @@
+from array import array
+
+# G열(브랜드/묶음) 연속 구간 인덱스
+# 업로드/파일 열기 시 한 번만 만들고, 읽기 시에는 O(1)로 조회합니다.
+
+
+class GRunIndex:
+    def __init__(self, g_values, first_row=2):
+        # g_values: first_row 부터 순서대로 정리된(clean_g_value 적용) G값 목록
+        self.first_row = first_row
+        self.run_starts = array('I')   # 구간 시작 행
+        self.run_lengths = array('I')  # 구간 길이
+        self.row_runs = array('I')     # 행 오프셋 -> 구간 번호
+
+        prev = None
+        for offset, g_value in enumerate(g_values):
+            if offset == 0 or g_value != prev:
+                self.run_starts.append(first_row + offset)
+                self.run_lengths.append(0)
+            self.run_lengths[-1] += 1
+            self.row_runs.append(len(self.run_starts) - 1)
+            prev = g_value
+
+    def __len__(self):
+        return len(self.row_runs)
+
+    def run_of(self, row):
+        # (구간 시작 행, 구간 길이, 구간 내 위치(0부터)) 반환, 범위 밖이면 None
+        offset = row - self.first_row
+        if offset < 0 or offset >= len(self.row_runs):
+            return None
+        run = self.row_runs[offset]
+        start = self.run_starts[run]
+        return start, self.run_lengths[run], row - start
+
+    def count_from(self, row):
+        # row 부터 같은 G값이 연속되는 개수 (count_consecutive_g_values 와 동일)
+        run = self.run_of(row)
+        if run is None:
+            return 0
+        _, length, position = run
+        return length - position
+
+    def bounds(self, lo, hi):
+        # 오프셋 [lo, hi) 를 바꿀 때 다시 계산해야 하는 범위: 앞뒤 바뀌지 않은 행이 속한 구간까지 포함
+        # (구간 번호 ra~rb, 오프셋 a~b) 반환
+        n = len(self.row_runs)
+        ra = self.row_runs[lo - 1] if lo > 0 else 0
+        a = self.run_starts[ra] - self.first_row if ra < len(self.run_starts) else n
+        if hi < n:
+            rb = self.row_runs[hi] + 1
+            b = self.run_starts[rb - 1] - self.first_row + self.run_lengths[rb - 1]
+        else:
+            rb = len(self.run_starts)
+            b = n
+        return ra, rb, a, b
+
+    def splice(self, lo, old_hi, new_hi, g_at):
+        # 오프셋 [lo, old_hi) 가 [lo, new_hi) 로 바뀐 뒤, 영향받는 구간만 다시 계산해서 끼워 넣음
+        # g_at(offset): 바뀐 뒤의 정리된 G값. 다시 계산한 (시작 오프셋, 끝 오프셋) 반환
+        ra, rb, a, b_old = self.bounds(lo, old_hi)
+        delta = new_hi - old_hi
+        b_new = b_old + delta
+
+        starts = array('I')
+        lengths = array('I')
+        runs = array('I')
+        prev = None
+        for offset in range(a, b_new):
+            value = g_at(offset)
+            if offset == a or value != prev:
+                starts.append(self.first_row + offset)
+                lengths.append(0)
+            lengths[-1] += 1
+            runs.append(ra + len(starts) - 1)
+            prev = value
+
+        shift = len(starts) - (rb - ra)
+        self.run_starts[ra:rb] = starts
+        self.run_lengths[ra:rb] = lengths
+        self.row_runs[a:b_old] = runs
+        if delta:
+            for run in range(ra + len(starts), len(self.run_starts)):
+                self.run_starts[run] += delta
+        if shift:
+            for offset in range(b_new, len(self.row_runs)):
+                self.row_runs[offset] += shift
+        return a, b_new
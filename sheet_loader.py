@@ -0,0 +1,219 @@
+import codecs
+import csv
+import io
+import os
+
+import openpyxl
+
+from row_store import RowStore
+
+# 엑셀/CSV 시트 스트리밍 로더
+# read_only 모드로 한 행씩 흘려 읽으면서 G~L열만 꺼내므로,
+# ERP 내보내기에 안 쓰는 열이 아무리 많아도 메모리 사용량이 늘지 않습니다.
+# WMS 의 CSV/TSV 내보내기(같은 G~L열 배치, 1행 헤더)도 같은 행 모델로 읽습니다.
+# load_any 는 확장자가 아니라 파일 앞부분(매직 바이트)으로 실제 형식을 판별하므로
+# 업로드를 임시 파일로 저장하지 않고 메모리(BytesIO)에서 바로 읽을 수 있습니다.
+
+FIRST_ROW = 2      # 1행은 헤더
+FIRST_COLUMN = 7   # G열
+LAST_COLUMN = 12   # L열
+
+SNIFF_BYTES = 64 * 1024
+
+XLSX_MAGIC = b'PK\x03\x04'                        # OOXML(.xlsx) = zip
+XLS_MAGIC = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'    # 예전 .xls(BIFF) = OLE2 복합 문서
+HEAD_BYTES = 512
+
+
+def iter_sheet_rows(source):
+    # source: 파일 경로 또는 파일 객체(BytesIO 등). (행번호, (g, h, i, j, k, l)) 를 순서대로 반환
+    wb = openpyxl.load_workbook(source, read_only=True, data_only=True)
+    try:
+        ws = wb.active
+        rows = ws.iter_rows(min_row=FIRST_ROW, min_col=FIRST_COLUMN,
+                            max_col=LAST_COLUMN, values_only=True)
+        for row, values in enumerate(rows, start=FIRST_ROW):
+            yield row, values
+    finally:
+        wb.close()
+
+
+def iter_xls_rows(source):
+    # 예전 엑셀(.xls, BIFF) -> iter_sheet_rows 와 같은 (행번호, (g, h, i, j, k, l))
+    # OLE2 파일은 스트리밍으로 읽을 수 없어 내용 전체를 메모리에 올려 xlrd 로 읽음 (xlrd 필요)
+    try:
+        import xlrd
+    except ImportError:
+        raise ValueError("예전 엑셀(.xls) 파일을 읽으려면 xlrd 패키지가 필요합니다. "
+                         "(pip install xlrd 또는 .xlsx/CSV 로 저장해서 올려 주세요)")
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as f:
+            content = f.read()
+    else:
+        content = source.read()
+    book = xlrd.open_workbook(file_contents=content, on_demand=True)
+    try:
+        sheet = book.sheet_by_index(0)
+        first, last = FIRST_COLUMN - 1, LAST_COLUMN
+        width = last - first
+        for rowx in range(FIRST_ROW - 1, sheet.nrows):
+            values = []
+            for cell in sheet.row_slice(rowx, first, last):
+                values.append(_xls_value(cell, book.datemode, xlrd))
+            values += [None] * (width - len(values))
+            yield rowx + 1, tuple(values)
+    finally:
+        book.release_resources()
+
+
+def _xls_value(cell, datemode, xlrd):
+    # openpyxl 과 같은 값으로: 빈 칸 None, 정수인 숫자는 int, 불리언/날짜는 해당 타입
+    ctype, value = cell.ctype, cell.value
+    if ctype in (xlrd.XL_CELL_EMPTY, xlrd.XL_CELL_BLANK, xlrd.XL_CELL_ERROR):
+        return None
+    if ctype == xlrd.XL_CELL_BOOLEAN:
+        return bool(value)
+    if ctype == xlrd.XL_CELL_DATE:
+        try:
+            return xlrd.xldate_as_datetime(value, datemode)
+        except (ValueError, OverflowError):
+            return value
+    if ctype == xlrd.XL_CELL_NUMBER and value.is_integer():
+        return int(value)
+    return value
+
+
+def detect_encoding(sample):
+    # BOM 이 있으면 그대로, 없으면 UTF-8 로 읽히는지 보고 아니면 CP949 (국내 엑셀/WMS 기본)
+    if sample.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    if sample.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return 'utf-16'
+    try:
+        # 표본 끝에서 글자가 잘렸을 수 있으므로 final=False
+        codecs.getincrementaldecoder('utf-8')().decode(sample, final=False)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        return 'cp949'
+
+
+def detect_delimiter(text):
+    try:
+        return csv.Sniffer().sniff(text, delimiters=',\t;').delimiter
+    except csv.Error:
+        return ','
+
+
+def _cell_value(value):
+    # 엑셀에서 숫자로 읽히던 L열 값을 CSV 에서도 숫자로 (빈 칸은 None)
+    value = value.strip()
+    if not value:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        pass
+    try:
+        return float(value)
+    except ValueError:
+        return value
+
+
+def iter_delimited_rows(source, delimiter=None, encoding=None):
+    # CSV/TSV 를 한 행씩 읽어 iter_sheet_rows 와 같은 (행번호, (g, h, i, j, k, l)) 로 반환
+    # source: 파일 경로 또는 바이너리 파일 객체 (되감기 가능해야 함)
+    own = isinstance(source, (str, os.PathLike))
+    raw = open(source, 'rb') if own else source
+    try:
+        start = raw.tell()
+        sample = raw.read(SNIFF_BYTES)
+        raw.seek(start)
+        encoding = encoding or detect_encoding(sample)
+        if delimiter is None:
+            delimiter = detect_delimiter(sample.decode(encoding, errors='ignore'))
+        text = io.TextIOWrapper(raw, encoding=encoding, errors='replace', newline='')
+        try:
+            reader = csv.reader(text, delimiter=delimiter)
+            next(reader, None)  # 헤더
+            first, last = FIRST_COLUMN - 1, LAST_COLUMN
+            width = last - first
+            for row, cells in enumerate(reader, start=FIRST_ROW):
+                values = cells[first:last]
+                if len(values) < width:
+                    values += [''] * (width - len(values))
+                yield row, tuple(values[:-1]) + (_cell_value(values[-1]),)
+        finally:
+            text.detach()  # 닫는 것은 호출한 쪽(또는 아래 own)이 담당
+    finally:
+        if own:
+            raw.close()
+
+
+def _store_rows(rows):
+    data = RowStore(first_row=FIRST_ROW)
+    for _, (g, h, i, j, k, l) in rows:
+        data.append(
+            str(g or "").strip(),
+            str(h or "").strip(),
+            str(i or "").strip(),
+            str(j or "").strip(),
+            str(k or "").strip(),
+            l
+        )
+    return data, data.max_row
+
+
+def load_rows(source):
+    # 업로드 화면들이 쓰는 행 저장소(RowStore)와 마지막 행 번호를 반환
+    return _store_rows(iter_sheet_rows(source))
+
+
+def load_delimited_rows(source, delimiter=None, encoding=None):
+    # CSV/TSV -> load_rows 와 같은 (RowStore, 마지막 행 번호)
+    return _store_rows(iter_delimited_rows(source, delimiter, encoding))
+
+
+def load_xls_rows(source):
+    # 예전 엑셀(.xls) -> load_rows 와 같은 (RowStore, 마지막 행 번호)
+    return _store_rows(iter_xls_rows(source))
+
+
+def sniff_format(head):
+    # 파일 앞부분으로 실제 형식 판별: 'xlsx', 'xls', 'html', 'binary', 'text'
+    if head.startswith(XLSX_MAGIC):
+        return 'xlsx'
+    if head.startswith(XLS_MAGIC):
+        return 'xls'
+    if head.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return 'text'
+    # 텍스트(CSV/TSV)에는 NUL 바이트가 없음: 이미지 등 다른 파일을 글자 깨진 행으로 읽지 않도록
+    if b'\x00' in head:
+        return 'binary'
+    # 일부 ERP 의 ".xls" 내보내기는 HTML 표라서 엑셀/CSV 어느 쪽으로도 읽을 수 없음
+    if head.lstrip(codecs.BOM_UTF8 + b' \t\r\n').startswith(b'<'):
+        return 'html'
+    return 'text'
+
+
+def load_any(source):
+    # 파일 앞부분(매직 바이트)으로 형식을 판별해서 엑셀/예전 엑셀/CSV/TSV 로더 선택
+    # source: 파일 경로 또는 바이너리 파일 객체. 확장자는 보지 않음 (.xls 로 저장된 xlsx/CSV 도 읽음)
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as f:
+            return load_any(f)
+    if not source.seekable():
+        source = io.BytesIO(source.read())
+
+    start = source.tell()
+    head = source.read(HEAD_BYTES)
+    source.seek(start)
+    kind = sniff_format(head)
+    if kind == 'xlsx':
+        return load_rows(source)
+    if kind == 'xls':
+        return load_xls_rows(source)
+    if kind == 'html':
+        raise ValueError("HTML 형식의 파일은 읽을 수 없습니다. 엑셀에서 .xlsx 또는 CSV 로 저장해서 올려 주세요.")
+    if kind == 'binary':
+        raise ValueError("엑셀(.xlsx, .xls) 또는 CSV/TSV 파일이 아닙니다.")
+    return load_delimited_rows(source)
@@ -0,0 +1,203 @@
+import difflib
+import os
+import threading
+
+from row_composer import RowComposer
+from row_store import COLUMNS
+from sheet_loader import load_any
+
+# 근무 중 수정되는 시트의 부분 갱신
+# 파일이 바뀌면 다시 읽은 행들을 기존 행 모델과 비교(diff)해서 달라진 행만 교체하고,
+# G열 연속 구간 인덱스도 영향받는 구간만 다시 계산합니다.
+# 바뀐 뒤 시트 어디에서도 읽지 않는 문장 목록을 돌려주므로, 호출한 쪽은 그 오디오만 지우면 됩니다.
+
+DEFAULT_POLL_INTERVAL = 1.0
+
+
+def _common_ends(old_rows, new_rows):
+    # 앞뒤로 같은 행 수 (head, tail)
+    n_old, n_new = len(old_rows), len(new_rows)
+    head = 0
+    while head < n_old and head < n_new and old_rows[head] == new_rows[head]:
+        head += 1
+    tail = 0
+    while (tail < n_old - head and tail < n_new - head
+           and old_rows[n_old - 1 - tail] == new_rows[n_new - 1 - tail]):
+        tail += 1
+    return head, tail
+
+
+def estimate_changed(data, new_data, rows=None):
+    # 바뀐 행 수의 빠른 추정 (정렬 비교 없이 O(n)). 부분 수정으로 처리할지 판단할 때 사용
+    # 행 수가 같으면 행끼리 비교한 개수, 다르면 앞뒤 공통 부분을 뺀 가운데 길이(상한)
+    # rows: 미리 만든 (row_tuples(data), row_tuples(new_data)). patch_rows 에 같은 것을 넘기면 한 번만 만듦
+    old_rows, new_rows = rows or (row_tuples(data), row_tuples(new_data))
+    head, tail = _common_ends(old_rows, new_rows)
+    if len(old_rows) == len(new_rows):
+        return sum(a != b for a, b in zip(old_rows[head:len(old_rows) - tail],
+                                          new_rows[head:len(new_rows) - tail]))
+    return max(len(old_rows), len(new_rows)) - head - tail
+
+
+def diff_rows(old_rows, new_rows):
+    # 바뀐 범위 목록 [(old_lo, old_hi, new_lo, new_hi)] (오프셋 기준, 앞에서부터 순서대로)
+    # 앞뒤 공통 부분을 먼저 잘라내고, 남은 가운데만 비교
+    n_old, n_new = len(old_rows), len(new_rows)
+    head, tail = _common_ends(old_rows, new_rows)
+    old_mid = old_rows[head:n_old - tail]
+    new_mid = new_rows[head:n_new - tail]
+    if not old_mid and not new_mid:
+        return []
+    if len(old_mid) == len(new_mid):
+        # 행 수가 같으면(수량/상품 수정) 행끼리 비교해서 연속된 변경 범위로 묶음
+        changes = []
+        changed = 0
+        for offset, (a, b) in enumerate(zip(old_mid, new_mid), start=head):
+            if a == b:
+                continue
+            changed += 1
+            if changes and changes[-1][1] == offset:
+                changes[-1][1] = changes[-1][3] = offset + 1
+            else:
+                changes.append([offset, offset + 1, offset, offset + 1])
+        # 대부분 달라졌으면 행 삽입과 삭제가 함께 있어 밀린 경우이므로 아래 정렬 비교로 넘김
+        if changed * 2 <= len(old_mid):
+            return [tuple(change) for change in changes]
+    matcher = difflib.SequenceMatcher(None, old_mid, new_mid, autojunk=False)
+    return [(head + i1, head + i2, head + j1, head + j2)
+            for tag, i1, i2, j1, j2 in matcher.get_opcodes() if tag != 'equal']
+
+
+def _row_texts(composer, offset):
+    # 이 행을 읽을 수 있는 문장들 (G 안내 포함/미포함 둘 다)
+    row = composer.first_row + offset
+    return {composer.sentence(row), composer.sentence(row, prev_g=composer.g_value(row))}
+
+
+def row_tuples(data):
+    # 행마다 (g, h, i, j, k, l) 튜플 (열 단위로 풀어서 한 번에 묶음)
+    return list(zip(*(data.column(name) for name in COLUMNS)))
+
+
+def _g_at(composer):
+    return lambda offset: composer.g_value(composer.first_row + offset)
+
+
+def patch_rows(data, composer, new_data, rows=None, collect_stale=True):
+    # data(RowStore) 를 new_data 와 같게 부분 수정. (바뀐 행번호 목록, 더 이상 쓰지 않는 문장 집합) 반환
+    # rows: estimate_changed 와 같은 미리 만든 행 튜플 쌍
+    # collect_stale=False 면 안 쓰는 문장을 모으지 않음 (오디오를 지우지 않는 호출자용, 빈 집합 반환)
+    old_rows, new_rows = rows or (row_tuples(data), row_tuples(new_data))
+    changes = diff_rows(old_rows, new_rows)
+
+    old_texts = set()
+    changed_rows = []
+    g_index = composer.g_index
+    for old_lo, old_hi, new_lo, new_hi in changes:
+        # 앞의 변경은 이미 반영됐으므로 현재 모델에서의 위치는 new_lo 부터
+        lo, hi = new_lo, new_lo + (old_hi - old_lo)
+        if collect_stale:
+            _, _, a, b_old = g_index.bounds(lo, hi)
+            for offset in range(a, b_old):
+                old_texts |= _row_texts(composer, offset)
+
+        data.splice(lo, hi, new_rows[new_lo:new_hi])
+        composer.sync()
+        g_index.splice(lo, hi, new_hi, _g_at(composer))
+        changed_rows.extend(range(data.first_row + new_lo, data.first_row + new_hi))
+
+    if not old_texts:
+        return changed_rows, old_texts
+    # 같은 문장(특히 G 안내 없는 문장)은 다른 구간의 행도 읽으므로,
+    # 바뀐 뒤 시트 전체에서 한 번도 읽지 않는 문장만 반환
+    return changed_rows, old_texts - sheet_texts(composer)
+
+
+def sheet_texts(composer):
+    # 시트의 행들이 읽을 수 있는 모든 문장 (_row_texts 를 모든 행에 대해 모은 것)
+    return set(composer.sentences()) | set(composer.sentences(announce_group=False))
+
+
+class LiveSheet:
+    # 디스크의 엑셀/CSV 파일과 동기화되는 행 모델 (data, composer, max_row)
+    def __init__(self, path, loader=load_any):
+        self.path = path
+        self.loader = loader
+        self.lock = threading.RLock()
+        self.refreshes = 0
+        self.patched_rows = 0
+        self._stat = self.stat()
+        self.data, _ = loader(path)
+        self.composer = RowComposer(self.data)
+
+    @property
+    def max_row(self):
+        return self.data.max_row
+
+    def stat(self):
+        st = os.stat(self.path)
+        return st.st_mtime_ns, st.st_size
+
+    def changed(self):
+        try:
+            return self.stat() != self._stat
+        except OSError:
+            return False
+
+    def refresh(self):
+        # 파일을 다시 읽어 바뀐 행만 반영. (바뀐 행번호 목록, 더 이상 쓰지 않는 문장 집합) 반환
+        stat = self.stat()
+        new_data, _ = self.loader(self.path)  # 파싱은 잠금 밖에서 (읽기를 막지 않음)
+        with self.lock:
+            changed_rows, stale_texts = patch_rows(self.data, self.composer, new_data)
+            self._stat = stat
+            self.refreshes += 1
+            self.patched_rows += len(changed_rows)
+        return changed_rows, stale_texts
+
+
+class SheetWatcher:
+    # LiveSheet 의 파일을 주기적으로 확인해서 바뀌면 refresh() 후 on_change(바뀐 행, 안 쓰는 문장) 호출
+    # 엑셀은 저장 중에 파일을 여러 번 쓰므로, 크기/수정시각이 한 주기 동안 그대로일 때 읽음
+    def __init__(self, sheet, on_change=None, on_error=None, interval=DEFAULT_POLL_INTERVAL):
+        self.sheet = sheet
+        self.on_change = on_change
+        self.on_error = on_error
+        self.interval = interval
+        self._pending = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='sheet-watcher', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.poll()
+
+    def poll(self):
+        if not self.sheet.changed():
+            self._pending = None
+            return
+        try:
+            stat = self.sheet.stat()
+        except OSError:
+            return
+        if stat != self._pending:
+            # 아직 쓰는 중일 수 있으니 다음 주기에 한 번 더 확인
+            self._pending = stat
+            return
+        self._pending = None
+        try:
+            changed_rows, stale_texts = self.sheet.refresh()
+        except Exception as e:
+            # 저장 도중이거나 잠겨 있으면 다음 변경 때 다시 시도 (기존 모델 유지)
+            if self.on_error:
+                self.on_error(e)
+            return
+        if self.on_change and (changed_rows or stale_texts):
+            self.on_change(changed_rows, stale_texts)
@@ -0,0 +1,111 @@
+import queue
+import threading
+from concurrent.futures import Future
+
+# 로컬 음성(pyttsx3) 전용 워커
+# 엔진 초기화(플랫폼 음성 드라이버 로드)는 워커 스레드에서 한 번만 하고,
+# 발화 요청은 큐로 받아 차례로 읽습니다. 호출한 쪽(Streamlit 스크립트 등)은 기다리지 않습니다.
+# 새 요청이 interrupt=True 로 들어오거나 cancel() 하면, 읽던 문장은 다음 단어에서 끊고
+# 아직 읽지 않은 이전 요청은 건너뜁니다.
+
+PYTTS_RATE_MAP = {"1": 150, "2": 175, "3": 200, "4": 225, "5": 260}
+DEFAULT_RATE = 200
+
+
+def _default_engine():
+    import pyttsx3
+    return pyttsx3.init()
+
+
+class SpeechWorker:
+    def __init__(self, engine_factory=None, rate=DEFAULT_RATE, volume=1.0, name='speech-worker'):
+        self.engine_factory = engine_factory or _default_engine
+        self.rate = rate
+        self.volume = volume
+        self.error = None       # 엔진 초기화 실패 시 예외
+        self.spoken = 0
+        self.interrupted = 0
+        self._queue = queue.Queue()
+        self._generation = 0    # cancel/interrupt 마다 증가. 이보다 오래된 요청은 버림
+        self._current = None    # 지금 읽고 있는 요청의 generation
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def say(self, text, rate=None, interrupt=True):
+        # 발화 요청을 넣고 Future 반환 (끝까지 읽으면 True, 끊기거나 건너뛰면 False)
+        future = Future()
+        with self._lock:
+            if interrupt:
+                self._generation += 1
+            self._queue.put((self._generation, text, rate or self.rate, future))
+        return future
+
+    def cancel(self):
+        # 읽던 문장을 끊고 대기 중인 요청을 모두 버림
+        with self._lock:
+            self._generation += 1
+
+    def wait_ready(self, timeout=None):
+        # 엔진 초기화가 끝날 때까지 기다림. 실패했으면 False
+        self._ready.wait(timeout)
+        return self._ready.is_set() and self.error is None
+
+    def stop(self):
+        self.cancel()
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+
+    def _stale(self, generation):
+        return generation != self._generation
+
+    def _on_word(self, name, location, length):
+        # 엔진 스레드(runAndWait 안)에서 호출되므로 여기서 stop() 해도 안전
+        if self._current is not None and self._stale(self._current):
+            self._engine.stop()
+
+    def _run(self):
+        try:
+            self._engine = self.engine_factory()
+            self._engine.setProperty('volume', self.volume)
+            self._engine.connect('started-word', self._on_word)
+        except Exception as e:
+            self.error = e
+            self._ready.set()
+            self._fail_pending(e)
+            return
+        self._ready.set()
+
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            generation, text, rate, future = item
+            if self._stale(generation):
+                future.set_result(False)
+                continue
+            self._current = generation
+            try:
+                self._engine.setProperty('rate', rate)
+                self._engine.say(text)
+                self._engine.runAndWait()
+            except Exception as e:
+                future.set_exception(e)
+                continue
+            finally:
+                self._current = None
+            if self._stale(generation):
+                self.interrupted += 1
+                future.set_result(False)
+            else:
+                self.spoken += 1
+                future.set_result(True)
+
+    def _fail_pending(self, error):
+        # 엔진이 없으면 이후 요청도 바로 실패 처리
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            item[3].set_exception(error)
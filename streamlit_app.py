@@ -1,14 +1,15 @@
 import streamlit as st
-import openpyxl
 import tempfile
 import os
 import uuid
 import io
-import re
+import hashlib
 import pandas as pd
-import pyttsx3
 import threading
 import time
+from sheet_loader import load_any
+from row_composer import RowComposer, compose_sheet
+from speech_worker import DEFAULT_RATE, PYTTS_RATE_MAP, SpeechWorker
 
 # 페이지 설정
 st.set_page_config(
@@ -18,43 +19,70 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# 사이즈 변환 딕셔너리
-SIZE_DICT = {
-    "XS": "엑스스몰", "S": "스몰", "M": "미디움", "L": "라지", "FREE": "프리",
-    "XL": "엑스라지", "XXL": "투엑스라지",
-    "JS": "주니어 스몰", "JM": "주니어 미디움", "JL": "주니어 라지"
+# 미리보기 창 크기 (현재 행 주변으로 보여줄 행 수)
+PREVIEW_WINDOW = 50
+PREVIEW_COLUMNS = {
+    'g': 'G열(브랜드)', 'h': 'H열', 'i': 'I열(상품명)',
+    'j': 'J열(색상)', 'k': 'K열(사이즈)', 'l': 'L열(수량)'
 }
 
-# 한국어 숫자 변환
-KOREAN_NUMBER_MAP = {
-    1: "한개", 2: "두개", 3: "세개", 4: "네개",
-    5: "다섯개", 6: "여섯개", 7: "일곱개",
-    8: "여덟개", 9: "아홉개", 10: "열개"
-}
+def build_preview_frame(data):
+    # 열 단위 저장소(RowStore)의 열을 그대로 넘겨 DataFrame 구성 (행마다 dict 를 만들지 않음)
+    frame = pd.DataFrame({label: data.column(name) for name, label in PREVIEW_COLUMNS.items()})
+    frame.insert(0, '행', range(data.first_row, data.first_row + len(data)))
+    # 위에서부터 차례로 읽을 때의 문장 (시트 전체를 한 번에 구성, COMPOSE_ENGINE 으로 엔진 선택)
+    frame['읽을 문장'] = compose_sheet(data, sequential=True)
+    return frame
+
+def get_preview_frame(file_data):
+    # 같은 업로드(key)면 이전에 만든 DataFrame 재사용
+    cached = st.session_state.get('preview_cache')
+    if cached is None or cached[0] != file_data['key']:
+        cached = (file_data['key'], build_preview_frame(file_data['data']))
+        st.session_state.preview_cache = cached
+    return cached[1]
 
-def convert_size(size_code):
-    return SIZE_DICT.get(str(size_code).upper(), size_code)
+def preview_window(total, index, size=PREVIEW_WINDOW):
+    # index(0부터) 행이 가운데 오도록 [lo, hi) 범위 계산
+    lo = max(0, min(index - size // 2, total - size))
+    return lo, min(total, lo + size)
 
-def convert_quantity(n):
-    if isinstance(n, int) and n >= 1:
-        return KOREAN_NUMBER_MAP.get(n, f"{n}개")
-    return ""
+# 업로드 파싱 캐시 (파일 내용 해시 기준, 최근 8개)
+# 버튼마다 st.rerun() 이 일어나도 같은 파일이면 다시 파싱하지 않습니다.
+# 반환값(RowStore)은 읽기 전용으로만 쓰므로 복사 없이 공유하는 cache_resource 사용
+PARSE_CACHE_ENTRIES = 8
 
-def clean_g_value(text):
-    return re.sub(r"\(.*?\)", "", text).strip()
+@st.cache_resource(max_entries=PARSE_CACHE_ENTRIES, show_spinner="시트 파일을 읽는 중...")
+def parse_upload(digest, _content):
+    # digest 로만 캐시 키를 만들고, 내용(_content)은 해시하지 않음
+    # 형식(xlsx/xls/CSV/TSV)은 확장자가 아니라 내용 앞부분으로 판별
+    data, max_row = load_any(io.BytesIO(_content))
+    return data, max_row, RowComposer(data)
 
-# 간단한 TTS 함수
-def speak_text(text):
-    try:
-        engine = pyttsx3.init()
-        engine.setProperty('rate', 200)  # 속도
-        engine.setProperty('volume', 1.0)  # 볼륨
-        engine.say(text)
-        engine.runAndWait()
-        return True
-    except Exception as e:
-        st.error(f"음성 재생 실패: {str(e)}")
+# 음성 워커 (프로세스당 하나: 엔진은 처음 한 번만 초기화, 재생은 워커 스레드에서)
+@st.cache_resource
+def get_speech_worker():
+    return SpeechWorker()
+
+# 간단한 TTS 함수 (기다리지 않고 큐에 넣음, 읽던 문장은 끊고 새 문장 읽기)
+def speak_text(text, speed="3"):
+    worker = get_speech_worker()
+    if not worker.wait_ready(timeout=5):
+        st.error(f"음성 재생 실패: {worker.error or '음성 엔진 초기화 시간 초과'}")
         return False
+    worker.say(text, rate=PYTTS_RATE_MAP.get(speed, DEFAULT_RATE))
+    return True
+
+# 현재 행을 읽을 문장 (공용 문장 구성기 사용, G값이 바뀌면 "브랜드 N개" 안내)
+def compose_current_text(announce_group):
+    file_data = st.session_state.file_data
+    composer = file_data['composer']
+    row = st.session_state.current_row
+    text = composer.sentence(row, st.session_state.prev_g_value, announce_group)
+    if text is None:
+        return ""
+    st.session_state.prev_g_value = composer.g_value(row)
+    return text
 
 # 세션 상태 초기화
 if 'file_data' not in st.session_state:
@@ -104,37 +132,26 @@ with col1:
     st.subheader("📂 파일 업로드")
     uploaded_file = st.file_uploader(
         "엑셀 파일을 선택하세요",
-        type=['xlsx', 'xls'],
-        help="엑셀 파일(.xlsx, .xls)을 업로드하세요"
+        type=['xlsx', 'xls', 'csv', 'tsv'],
+        help="엑셀 파일(.xlsx, .xls) 또는 WMS 내보내기 CSV/TSV 파일을 업로드하세요"
     )
     
     if uploaded_file is not None:
         try:
-            # 엑셀 파일 읽기
-            wb = openpyxl.load_workbook(io.BytesIO(uploaded_file.read()), data_only=True)
-            ws = wb.active
-            
-            # 데이터 추출
-            data = []
-            max_row = ws.max_row
-            
-            for row in range(2, max_row + 1):  # 헤더 제외
-                row_data = {
-                    'row': row,
-                    'g': str(ws.cell(row=row, column=7).value or "").strip(),
-                    'h': str(ws.cell(row=row, column=8).value or "").strip(),
-                    'i': str(ws.cell(row=row, column=9).value or "").strip(),
-                    'j': str(ws.cell(row=row, column=10).value or "").strip(),
-                    'k': str(ws.cell(row=row, column=11).value or "").strip(),
-                    'l': ws.cell(row=row, column=12).value
+            # 시트 파일 읽기 (엑셀/CSV/TSV 스트리밍, G~L열만 추출, 같은 내용이면 캐시 사용)
+            content = uploaded_file.getvalue()
+            digest = hashlib.sha256(content).hexdigest()
+            file_data = st.session_state.file_data
+            if not file_data or file_data.get('key') != digest:
+                data, max_row, composer = parse_upload(digest, content)
+                st.session_state.file_data = {
+                    'data': data,
+                    'max_row': max_row,
+                    'composer': composer,
+                    'filename': uploaded_file.name,
+                    'key': digest
                 }
-                data.append(row_data)
-            
-            st.session_state.file_data = {
-                'data': data,
-                'max_row': max_row,
-                'filename': uploaded_file.name
-            }
+            data = st.session_state.file_data['data']
             
             st.success(f"✅ {uploaded_file.name} 파일이 성공적으로 로드되었습니다! ({len(data)}개 행)")
             
@@ -190,46 +207,23 @@ with col2:
     with col_btn2:
         if st.button("⏹️ 중지", type="secondary", use_container_width=True):
             st.session_state.reading = False
+            get_speech_worker().cancel()
             st.rerun()
     
     # 단일 행 읽기
     if st.button("🔊 현재 행 읽기", use_container_width=True):
         if st.session_state.file_data and st.session_state.current_row <= len(st.session_state.file_data['data']):
             # 현재 행 읽기 로직
-            current_data = st.session_state.file_data['data'][st.session_state.current_row - 2]
-            
-            # 읽을 텍스트 구성
-            text_parts = []
-            
-            # G열 (브랜드/묶음) 처리
-            g_value = clean_g_value(current_data['g'])
-            if announce_group and g_value and g_value != st.session_state.prev_g_value:
-                text_parts.append(g_value)
-            
-            st.session_state.prev_g_value = g_value
-            
-            # 상품명, 색상, 사이즈, 수량
-            if current_data['i']:
-                text_parts.append(current_data['i'])
-            if current_data['j']:
-                text_parts.append(current_data['j'])
-            if current_data['k']:
-                text_parts.append(convert_size(current_data['k']))
-            if current_data['l'] and isinstance(current_data['l'], (int, float)) and current_data['l'] >= 2:
-                text_parts.append(convert_quantity(int(current_data['l'])))
-            
-            combined_text = " ".join(text_parts)
+            combined_text = compose_current_text(announce_group)
             
             if combined_text.strip():
                 st.info(f"🔊 읽을 내용: {combined_text}")
                 
                 # TTS 실행
-                with st.spinner("음성을 재생하고 있습니다..."):
-                    success = speak_text(combined_text)
-                    if success:
-                        st.success("✅ 음성 재생 완료!")
-                    else:
-                        st.error("❌ 음성 재생 실패")
+                if speak_text(combined_text, speed):
+                    st.success("🔊 음성 재생을 시작했습니다.")
+                else:
+                    st.error("❌ 음성 재생 실패")
             else:
                 st.warning("읽을 내용이 없습니다.")
         else:
@@ -290,40 +284,16 @@ with col2:
         if st.button("2️⃣ 다시 읽기", use_container_width=True, key="kb_2"):
             if st.session_state.file_data:
                 # 현재 행 읽기 로직
-                current_data = st.session_state.file_data['data'][st.session_state.current_row - 2]
-                
-                # 읽을 텍스트 구성
-                text_parts = []
-                
-                # G열 (브랜드/묶음) 처리
-                g_value = clean_g_value(current_data['g'])
-                if announce_group and g_value and g_value != st.session_state.prev_g_value:
-                    text_parts.append(g_value)
-                
-                st.session_state.prev_g_value = g_value
-                
-                # 상품명, 색상, 사이즈, 수량
-                if current_data['i']:
-                    text_parts.append(current_data['i'])
-                if current_data['j']:
-                    text_parts.append(current_data['j'])
-                if current_data['k']:
-                    text_parts.append(convert_size(current_data['k']))
-                if current_data['l'] and isinstance(current_data['l'], (int, float)) and current_data['l'] >= 2:
-                    text_parts.append(convert_quantity(int(current_data['l'])))
-                
-                combined_text = " ".join(text_parts)
+                combined_text = compose_current_text(announce_group)
                 
                 if combined_text.strip():
                     st.info(f"🔊 읽을 내용: {combined_text}")
                     
                     # TTS 실행
-                    with st.spinner("음성을 재생하고 있습니다..."):
-                        success = speak_text(combined_text)
-                        if success:
-                            st.success("✅ 음성 재생 완료!")
-                        else:
-                            st.error("❌ 음성 재생 실패")
+                    if speak_text(combined_text, speed):
+                        st.success("🔊 음성 재생을 시작했습니다.")
+                    else:
+                        st.error("❌ 음성 재생 실패")
                 else:
                     st.warning("읽을 내용이 없습니다.")
     
@@ -353,20 +323,10 @@ with col2:
 if st.session_state.file_data:
     st.subheader("📋 엑셀 데이터 미리보기")
     
-    # 데이터프레임 생성
-    df_data = []
-    for item in st.session_state.file_data['data']:
-        df_data.append({
-            '행': item['row'],
-            'G열(브랜드)': item['g'],
-            'H열': item['h'],
-            'I열(상품명)': item['i'],
-            'J열(색상)': item['j'],
-            'K열(사이즈)': item['k'],
-            'L열(수량)': item['l']
-        })
-    
-    df = pd.DataFrame(df_data)
+    # 데이터프레임은 업로드마다 한 번만 만들고, 화면에는 현재 행 주변만 잘라서 스타일 적용
+    preview_df = get_preview_frame(st.session_state.file_data)
+    lo, hi = preview_window(len(preview_df), st.session_state.current_row - 2)
+    window_df = preview_df.iloc[lo:hi]
     
     # 현재 행 하이라이트를 위한 스타일링
     def highlight_current_row(row):
@@ -374,8 +334,8 @@ if st.session_state.file_data:
             return ['background-color: #ffeb3b'] * len(row)
         return [''] * len(row)
     
-    # 스타일 적용
-    styled_df = df.style.apply(highlight_current_row, axis=1)
+    # 스타일 적용 (창 안의 행만)
+    styled_df = window_df.style.apply(highlight_current_row, axis=1)
     
     # 데이터프레임 표시
     st.dataframe(
@@ -384,6 +344,8 @@ if st.session_state.file_data:
         height=400,
         hide_index=True
     )
+    if len(preview_df):
+        st.caption(f"전체 {len(preview_df)}개 행 중 {lo + 2}~{hi + 1}행 표시")
     
     # 현재 행 정보
     st.markdown(f"**현재 선택된 행: {st.session_state.current_row}**")
@@ -440,9 +402,7 @@ if st.button("🔊 음성 테스트", use_container_width=True):
     test_text = "안녕하세요. 음성 테스트입니다."
     st.info(f"테스트 텍스트: {test_text}")
     
-    with st.spinner("음성을 재생하고 있습니다..."):
-        success = speak_text(test_text)
-        if success:
-            st.success("✅ 음성 테스트 성공!")
-        else:
-            st.error("❌ 음성 테스트 실패")
\ No newline at end of file
+    if speak_text(test_text, speed):
+        st.success("✅ 음성 테스트를 재생합니다.")
+    else:
+        st.error("❌ 음성 테스트 실패")
\ No newline at end of file
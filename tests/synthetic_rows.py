@@ -0,0 +1,34 @@
+import random
+
+from row_store import RowStore
+
+# 테스트용 행 저장소와 무작위 G~L 행 (괄호 붙은 G값, 빈 G값, 숫자/문자열/불리언 수량 섞임)
+BRANDS = ["나이키(본사)", "나이키", "아디다스", "푸마 (직배)", ""]
+PRODUCTS = ["반팔티", "후드티", "양말"]
+COLORS = ["블랙", "화이트", ""]
+SIZES = ["S", "m", "XL", "FREE", "JS", ""]
+QUANTITIES = [1, 2, 3, 12, 2.0, "3", "1", True, None, ""]
+
+
+def random_row(rnd):
+    return (rnd.choice(BRANDS), f"H{rnd.randint(1, 9)}", rnd.choice(PRODUCTS),
+            rnd.choice(COLORS), rnd.choice(SIZES), rnd.choice(QUANTITIES))
+
+
+def random_rows(n, seed=0, max_run=6):
+    # 같은 G값이 몇 행씩 이어지도록 구간 단위로 생성
+    rnd = random.Random(seed)
+    rows = []
+    while len(rows) < n:
+        row = random_row(rnd)
+        for _ in range(rnd.randint(1, max_run)):
+            rows.append((row[0],) + random_row(rnd)[1:])
+    return rows[:n]
+
+
+def make_store(rows, first_row=2):
+    # (g, h, i, j, k, l) 튜플 목록 -> RowStore
+    data = RowStore(first_row=first_row)
+    for row in rows:
+        data.append(*row)
+    return data
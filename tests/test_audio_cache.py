@@ -0,0 +1,117 @@
+import asyncio
+import os
+
+import pytest
+
+from audio_cache import AudioCache, cache_key, fragments_text
+
+
+class FakeBackend:
+    # edge-tts 대신 "텍스트를 그대로 파일에 쓰는" 합성기 (호출 횟수 기록)
+    def __init__(self, size=None, fail=False):
+        self.calls = []
+        self.size = size
+        self.fail = fail
+
+    async def __call__(self, text, voice, rate, out_path):
+        self.calls.append(text)
+        with open(out_path, 'wb') as f:
+            f.write(b'x' * self.size if self.size else text.encode('utf-8'))
+        if self.fail:
+            raise RuntimeError("합성 실패")
+
+
+def make_cache(directory, **kwargs):
+    backend = kwargs.pop('synthesize', None) or FakeBackend()
+    return AudioCache(directory=str(directory), synthesize=backend, **kwargs), backend
+
+
+def synth(cache, text, voice='v', rate='+0%'):
+    return asyncio.run(cache.get_or_synthesize(text, voice, rate))
+
+
+def test_hit_and_miss_counts(tmp_path):
+    cache, backend = make_cache(tmp_path)
+    first = synth(cache, "나이키 반팔티")
+    second = synth(cache, "나이키 반팔티")
+    assert first == second
+    assert backend.calls == ["나이키 반팔티"]
+    # 음성/속도가 다르면 다른 항목
+    synth(cache, "나이키 반팔티", rate='+25%')
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['entries']) == (1, 2, 2)
+    assert cache.peek("나이키 반팔티", 'v', '+0%') == first
+    assert cache.peek("없는 문장", 'v', '+0%') is None
+
+
+def test_lru_eviction_order(tmp_path):
+    cache, _ = make_cache(tmp_path, synthesize=FakeBackend(size=100), max_bytes=300)
+    for text in ("a", "b", "c"):
+        synth(cache, text)
+    synth(cache, "a")  # a 를 최근 사용으로
+    synth(cache, "d")  # 한도 초과 -> 가장 오래 안 쓴 b 부터 제거
+    assert cache.peek("b", 'v', '+0%') is None
+    assert all(cache.peek(t, 'v', '+0%') for t in ("a", "c", "d"))
+    assert not os.path.exists(cache.path_for(cache_key("b", 'v', '+0%')))
+    stats = cache.stats()
+    assert (stats['evictions'], stats['bytes']) == (1, 300)
+
+
+def test_restart_reregisters_files_by_last_use(tmp_path):
+    cache, _ = make_cache(tmp_path, synthesize=FakeBackend(size=100))
+    for when, text in enumerate(("old", "mid", "new")):
+        path = synth(cache, text)
+        os.utime(path, (1000 + when, 1000 + when))
+
+    restarted, backend = make_cache(tmp_path, synthesize=FakeBackend(size=100), max_bytes=250)
+    # 다시 등록할 때 한도를 넘으면 가장 오래 안 쓴 파일부터 제거
+    assert restarted.peek("old", 'v', '+0%') is None
+    assert synth(restarted, "new") == cache.path_for(cache_key("new", 'v', '+0%'))
+    assert backend.calls == []
+    assert restarted.stats()['entries'] == 2
+
+
+def test_failed_synthesis_leaves_no_part_file(tmp_path):
+    cache, _ = make_cache(tmp_path, synthesize=FakeBackend(fail=True))
+    with pytest.raises(RuntimeError):
+        synth(cache, "실패")
+    assert os.listdir(tmp_path) == []
+    assert cache.stats()['entries'] == 0
+
+
+def test_reap_by_age(tmp_path):
+    cache, _ = make_cache(tmp_path, max_age=100)
+    old = synth(cache, "old")
+    synth(cache, "new")
+    now = cache._used[cache_key("new", 'v', '+0%')]
+    cache._used[cache_key("old", 'v', '+0%')] = now - 200
+    stale_part = os.path.join(str(tmp_path), "leftover.part")
+    open(stale_part, 'wb').close()
+    os.utime(stale_part, (now - 3600, now - 3600))
+
+    assert cache.reap(now=now) == 1
+    assert not os.path.exists(old)
+    assert not os.path.exists(stale_part)
+    assert cache.peek("new", 'v', '+0%')
+
+
+def test_fragment_stitching(tmp_path):
+    cache, backend = make_cache(tmp_path)
+    parts = ["나이키", "", "반팔티", "블랙"]
+    path = asyncio.run(cache.get_or_synthesize_fragments(parts, 'v', '+0%'))
+    with open(path, 'rb') as f:
+        assert f.read() == "나이키반팔티블랙".encode('utf-8')
+    assert path == cache.peek(fragments_text(parts), 'v', '+0%')
+    # 조각은 각각 캐시되므로 다른 행에서 재사용
+    asyncio.run(cache.get_or_synthesize_fragments(["나이키", "후드티"], 'v', '+0%'))
+    assert backend.calls == ["나이키", "반팔티", "블랙", "후드티"]
+
+
+def test_adopts_files_written_by_another_process(tmp_path):
+    server, server_backend = make_cache(tmp_path)
+    cli, _ = make_cache(tmp_path)
+    path = synth(cli, "미리 합성")
+    assert server.peek("미리 합성", 'v', '+0%') == path
+    assert server.contains_file(os.path.basename(path))
+    assert synth(server, "미리 합성") == path
+    assert server_backend.calls == []
@@ -0,0 +1,52 @@
+import hashlib
+
+import pytest
+
+pytest.importorskip("flask")
+
+import app as web  # noqa: E402
+from audio_cache import AudioCache, cache_key  # noqa: E402
+
+CONTENT = bytes(range(256)) * 8
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    cache = AudioCache(directory=str(tmp_path))
+    key = cache_key("나이키 반팔티", 'ko-KR-SunHiNeural', '+0%')
+    src = tmp_path / "clip.part"
+    src.write_bytes(CONTENT)
+    cache.put_file(key, str(src))
+    monkeypatch.setattr(web, 'audio_cache', cache)
+    client = web.app.test_client()
+    client.filename = key + '.mp3'
+    return client
+
+
+def test_strong_etag_and_immutable_cache(client):
+    response = client.get(f'/audio/{client.filename}')
+    assert response.status_code == 200
+    assert response.data == CONTENT
+    assert response.headers['ETag'] == f'"{hashlib.sha256(CONTENT).hexdigest()}"'
+    cache_control = response.headers['Cache-Control']
+    assert set(p.strip() for p in cache_control.split(',')) == {'public', 'max-age=31536000', 'immutable'}
+
+
+def test_if_none_match_returns_304(client):
+    etag = client.get(f'/audio/{client.filename}').headers['ETag']
+    response = client.get(f'/audio/{client.filename}', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.data == b''
+
+
+def test_range_request_returns_206(client):
+    response = client.get(f'/audio/{client.filename}', headers={'Range': 'bytes=100-199'})
+    assert response.status_code == 206
+    assert response.headers['Content-Range'] == f'bytes 100-199/{len(CONTENT)}'
+    assert response.data == CONTENT[100:200]
+
+
+def test_unmanaged_files_return_404(client, tmp_path):
+    (tmp_path / "other.mp3").write_bytes(b"not a cache entry")
+    for name in ("other.mp3", "0" * 64 + ".mp3", client.filename[:-4] + ".wav"):
+        assert client.get(f'/audio/{name}').status_code == 404
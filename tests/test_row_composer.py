@@ -0,0 +1,74 @@
+import pytest
+
+from row_composer import RowComposer, clean_g_value, compose_sheet, parse_quantity, quantity_text
+from synthetic_rows import make_store
+
+
+ROWS = [
+    ("나이키(본사)", "H1", "반팔티", "블랙", "M", 1),
+    ("나이키", "H2", "후드티", "화이트", "xl", 3),
+    ("나이키 (직배)", "H3", "양말", "", "FREE", None),
+    ("아디다스", "H4", "캡모자", "네이비", "", "2"),
+    ("", "H5", "조거팬츠", "그레이", "JS", 2.0),
+    ("", "H6", "바람막이", "", "", True),
+    ("푸마", "H7", "반팔티", "블랙", "L", 12),
+]
+
+
+def test_clean_g_value_strips_parentheses():
+    assert clean_g_value("나이키(본사)") == "나이키"
+    assert clean_g_value("나이키 (직배)") == "나이키"
+    assert clean_g_value("(미정)") == ""
+    assert clean_g_value("뉴발란스") == "뉴발란스"
+
+
+def test_g_runs_use_cleaned_values():
+    composer = RowComposer(make_store(ROWS))
+    # 괄호를 뗀 "나이키" 세 행이 한 구간
+    assert [composer.g_index.count_from(row) for row in range(2, 9)] == [3, 2, 1, 1, 2, 1, 1]
+    assert composer.g_value(2) == composer.g_value(4) == "나이키"
+
+
+@pytest.mark.parametrize("value, expected", [
+    (3, 3), ("3", 3), (" 4 ", 4), (2.0, 2), (2.5, 2),
+    (1, None), ("1", None), (0, None), (True, None), (False, None),
+    (None, None), ("", None), ("두개", None),
+])
+def test_parse_quantity_reads_two_or_more(value, expected):
+    assert parse_quantity(value) == expected
+
+
+def test_quantity_text():
+    assert quantity_text("3") == "세개"
+    assert quantity_text(2.0) == "두개"
+    assert quantity_text(12) == "12개"
+    assert quantity_text(True) == ""
+    assert quantity_text(None) == ""
+
+
+def test_sentences_announce_group_with_remaining_count():
+    composer = RowComposer(make_store(ROWS))
+    assert composer.sentence(2) == "나이키 세개 반팔티 블랙 미디움"
+    assert composer.sentence(3) == "나이키 두개 후드티 화이트 엑스라지 세개"
+    # 직전에 읽은 G값과 같으면 안내하지 않음
+    assert composer.sentence(3, prev_g="나이키") == "후드티 화이트 엑스라지 세개"
+    assert composer.sentence(5) == "아디다스 캡모자 네이비 두개"
+    assert composer.sentence(6) == "조거팬츠 그레이 주니어 스몰 두개"
+    assert composer.sentence(7) == "바람막이"
+    assert composer.sentence(2, announce_group=False) == "반팔티 블랙 미디움"
+    assert composer.sentence(1) is None
+    assert composer.sentence(9) is None
+
+
+def test_sequential_announces_only_at_run_start():
+    composer = RowComposer(make_store(ROWS))
+    assert composer.sentences(sequential=True)[:3] == [
+        "나이키 세개 반팔티 블랙 미디움",
+        "후드티 화이트 엑스라지 세개",
+        "양말 프리",
+    ]
+
+
+def test_compose_sheet_rejects_unknown_engine():
+    with pytest.raises(ValueError):
+        compose_sheet(make_store(ROWS), engine='fortran')
@@ -0,0 +1,132 @@
+import codecs
+import csv
+import io
+
+import openpyxl
+import pytest
+
+from row_store import COLUMNS
+from sheet_loader import (XLS_MAGIC, detect_delimiter, detect_encoding, load_any, load_delimited_rows,
+                          load_rows, sniff_format)
+
+HEADER = ["A", "B", "C", "D", "E", "F", "G", "H", "I", "J", "K", "L"]
+ROWS = [
+    ("나이키(본사)", "H1001", "반팔티", "블랙", "M", 1),
+    ("나이키(본사)", "H1002", "후드티, 기모", "화이트", "XL", 3),
+    ("", "H1003", "양말", "", "FREE", None),
+    ("아디다스", "1234", "캡모자", "네이비", "S", 12),
+    ("  푸마 ", "H1005", '조거 "팬츠"', "그레이", "JS", 2.5),
+]
+
+
+def workbook_bytes(rows):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(HEADER)
+    for row in rows:
+        ws.append([""] * 6 + list(row))
+    buf = io.BytesIO()
+    wb.save(buf)
+    return buf.getvalue()
+
+
+def delimited_bytes(rows, encoding='utf-8', delimiter=','):
+    buf = io.StringIO(newline='')
+    writer = csv.writer(buf, delimiter=delimiter)
+    writer.writerow(HEADER)
+    for row in rows:
+        writer.writerow([""] * 6 + ["" if v is None else v for v in row])
+    return buf.getvalue().encode(encoding)
+
+
+def columns(data):
+    return [list(data.column(name)) for name in COLUMNS]
+
+
+def test_detect_encoding():
+    text = "G,H\n나이키,반팔티\n"
+    assert detect_encoding(text.encode('utf-8')) == 'utf-8'
+    assert detect_encoding(text.encode('cp949')) == 'cp949'
+    assert detect_encoding(codecs.BOM_UTF8 + text.encode('utf-8')) == 'utf-8-sig'
+    assert detect_encoding(text.encode('utf-16')) == 'utf-16'
+    # 표본 끝에서 잘린 UTF-8 글자는 CP949 로 오판하지 않음
+    assert detect_encoding(text.encode('utf-8')[:-5]) == 'utf-8'
+    assert detect_encoding(b"") == 'utf-8'
+
+
+def test_detect_delimiter():
+    assert detect_delimiter("a,b,c\n1,2,3\n") == ','
+    assert detect_delimiter("a\tb\tc\n1\t2\t3\n") == '\t'
+    assert detect_delimiter("a;b;c\n1;2;3\n") == ';'
+    assert detect_delimiter("") == ','
+
+
+@pytest.mark.parametrize("encoding, delimiter", [
+    ('utf-8', ','), ('cp949', ','), ('utf-8-sig', ','), ('utf-8', '\t'), ('cp949', '\t'),
+])
+def test_delimited_rows_match_xlsx(encoding, delimiter):
+    expected, expected_max = load_rows(io.BytesIO(workbook_bytes(ROWS)))
+    data, max_row = load_delimited_rows(io.BytesIO(delimited_bytes(ROWS, encoding, delimiter)))
+    assert columns(data) == columns(expected)
+    assert max_row == expected_max == len(ROWS) + 1
+    assert data.get_row(3)['i'] == "후드티, 기모"
+    assert data.get_row(6)['l'] == 2.5
+
+
+def test_header_only_file():
+    data, max_row = load_delimited_rows(io.BytesIO(delimited_bytes([])))
+    assert len(data) == 0
+    assert max_row == load_rows(io.BytesIO(workbook_bytes([])))[1]
+
+
+def test_short_rows_are_padded():
+    content = "\n".join([",".join(HEADER), ",,,,,,나이키,H1", ""]).encode('utf-8')
+    data, _ = load_delimited_rows(io.BytesIO(content))
+    assert data.get_row(2) == {'row': 2, 'g': "나이키", 'h': "H1", 'i': "", 'j': "", 'k': "", 'l': None}
+
+
+PNG_HEAD = b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR\x00\x00\x01\x00"
+
+
+def test_sniff_format():
+    assert sniff_format(workbook_bytes(ROWS)[:512]) == 'xlsx'
+    assert sniff_format(XLS_MAGIC + b"\x00" * 100) == 'xls'
+    assert sniff_format(b"\xef\xbb\xbf  <html><table>") == 'html'
+    assert sniff_format(PNG_HEAD) == 'binary'
+    assert sniff_format(delimited_bytes(ROWS, 'cp949')) == 'text'
+    assert sniff_format("G,H\n".encode('utf-16')) == 'text'
+
+
+def test_load_any_routes_by_content_not_name(tmp_path):
+    expected, _ = load_rows(io.BytesIO(workbook_bytes(ROWS)))
+    # 확장자가 틀린 파일도 내용으로 판별
+    for name, content in (("sheet.xls", workbook_bytes(ROWS)),
+                          ("sheet.xlsx", delimited_bytes(ROWS, 'cp949', '\t')),
+                          ("sheet.csv", delimited_bytes(ROWS, 'utf-8-sig'))):
+        path = tmp_path / name
+        path.write_bytes(content)
+        assert columns(load_any(str(path))[0]) == columns(expected)
+        assert columns(load_any(io.BytesIO(content))[0]) == columns(expected)
+
+
+@pytest.mark.parametrize("content", [
+    b"<html><body><table><tr><td>G</td></tr></table></body></html>",
+    PNG_HEAD + b"\x00" * 64,
+])
+def test_load_any_rejects_html_and_binary(content):
+    with pytest.raises(ValueError):
+        load_any(io.BytesIO(content))
+
+
+@pytest.mark.parametrize("filename, content", [
+    ("export.xls", b"<html><table><tr><td>G</td></tr></table></html>"),
+    ("photo.xlsx", PNG_HEAD + b"\x00" * 64),
+])
+def test_upload_rejects_unreadable_files_with_400(filename, content):
+    pytest.importorskip("flask")
+    import app as web
+
+    response = web.app.test_client().post(
+        '/upload', data={'file': (io.BytesIO(content), filename)}, content_type='multipart/form-data')
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
@@ -0,0 +1,129 @@
+import random
+
+import pytest
+
+from row_composer import RowComposer
+from row_store import COLUMNS
+from sheet_index import GRunIndex
+from sheet_refresh import diff_rows, estimate_changed, patch_rows, row_tuples, sheet_texts
+from synthetic_rows import make_store, random_row, random_rows
+
+
+def columns(data):
+    return [list(data.column(name)) for name in COLUMNS]
+
+
+def edit(rows, rnd, n_edits):
+    # 무작위 삽입/삭제/수정
+    rows = list(rows)
+    for _ in range(n_edits):
+        op = rnd.choice("idm")
+        if op == "i" or not rows:
+            at = rnd.randint(0, len(rows))
+            rows[at:at] = [random_row(rnd) for _ in range(rnd.randint(1, 3))]
+        elif op == "d":
+            at = rnd.randrange(len(rows))
+            del rows[at:at + rnd.randint(1, 3)]
+        else:
+            rows[rnd.randrange(len(rows))] = random_row(rnd)
+    return rows
+
+
+def assert_same_as_rebuild(composer, data, rows):
+    fresh = make_store(rows)
+    ref = RowComposer(fresh)
+    assert columns(data) == columns(fresh)
+    assert data.max_row == fresh.max_row
+    index, expected = composer.g_index, ref.g_index
+    assert list(index.run_starts) == list(expected.run_starts)
+    assert list(index.run_lengths) == list(expected.run_lengths)
+    assert list(index.row_runs) == list(expected.row_runs)
+    for sequential in (False, True):
+        assert composer.sentences(sequential=sequential) == ref.sentences(sequential=sequential)
+
+
+def test_diff_rows():
+    old = list("abcdef")
+    assert diff_rows(old, old) == []
+    assert diff_rows(old, list("abXdef")) == [(2, 3, 2, 3)]
+    assert diff_rows(old, list("abcXdef")) == [(3, 3, 3, 4)]
+    assert diff_rows(old, list("abdef")) == [(2, 3, 2, 2)]
+    # 같은 길이지만 한 행 삽입 + 한 행 삭제로 밀린 경우는 행 전체를 바꾸지 않음
+    assert diff_rows(old, list("Xabcde")) == [(0, 0, 0, 1), (5, 6, 6, 6)]
+
+
+def test_estimate_changed():
+    rows = random_rows(50)
+    data = make_store(rows)
+    assert estimate_changed(data, make_store(rows)) == 0
+    modified = list(rows)
+    modified[10] = ("새 브랜드",) + rows[10][1:]
+    modified[40] = ("새 브랜드",) + rows[40][1:]
+    assert estimate_changed(data, make_store(modified)) == 2
+    assert estimate_changed(data, make_store(rows[:20] + rows[21:])) == 1
+    # 행 수가 다르면 앞뒤 공통 부분을 뺀 가운데 전체 (상한)
+    assert estimate_changed(data, make_store(rows[:20] + rows[21:-1] + [("새 브랜드",) + rows[-1][1:]])) == 30
+
+
+@pytest.mark.parametrize("op", ["insert", "delete", "modify"])
+def test_patch_rows_single_edit(op):
+    rows = random_rows(40, seed=3)
+    new = list(rows)
+    if op == "insert":
+        new[12:12] = [("아디다스", "H1", "양말", "블랙", "S", 2)]
+    elif op == "delete":
+        del new[12]
+    else:
+        new[12] = (new[12][0], "H9", "후드티", "화이트", "XL", "3")
+    data = make_store(rows)
+    composer = RowComposer(data)
+    changed_rows, _ = patch_rows(data, composer, make_store(new))
+    assert changed_rows == ([] if op == "delete" else [14])
+    assert_same_as_rebuild(composer, data, new)
+
+
+def test_patch_rows_matches_rebuild_after_random_edits():
+    rnd = random.Random(7)
+    for _ in range(300):
+        rows = random_rows(rnd.randint(0, 40), seed=rnd.random())
+        new = edit(rows, rnd, rnd.randint(1, 4))
+        data = make_store(rows)
+        composer = RowComposer(data)
+        before = sheet_texts(composer)
+        _, stale = patch_rows(data, composer, make_store(new))
+        assert_same_as_rebuild(composer, data, new)
+        after = sheet_texts(RowComposer(make_store(new)))
+        # 사라진 문장은 모두 보고하고, 아직 읽는 문장은 보고하지 않음
+        assert before - after <= stale
+        assert not stale & after
+
+
+def test_patch_rows_with_shared_tuples_without_stale():
+    # 업로드 경로: 추정에 쓴 행 튜플을 그대로 넘기고 안 쓰는 문장은 모으지 않음
+    rnd = random.Random(5)
+    rows = random_rows(40, seed=5)
+    new = edit(rows, rnd, 3)
+    data, new_data = make_store(rows), make_store(new)
+    composer = RowComposer(data)
+    shared = (row_tuples(data), row_tuples(new_data))
+    assert estimate_changed(data, new_data, rows=shared) == estimate_changed(data, new_data)
+    changed_rows, stale = patch_rows(data, composer, new_data, rows=shared, collect_stale=False)
+    assert stale == set()
+    assert changed_rows == patch_rows(make_store(rows), RowComposer(make_store(rows)), new_data)[0]
+    assert_same_as_rebuild(composer, data, new)
+
+
+def test_g_run_index_splice_matches_rebuild():
+    rnd = random.Random(11)
+    for _ in range(300):
+        values = [rnd.choice("aab") for _ in range(rnd.randint(1, 30))]
+        lo = rnd.randint(0, len(values))
+        old_hi = rnd.randint(lo, len(values))
+        new_values = values[:lo] + [rnd.choice("abc") for _ in range(rnd.randint(0, 4))] + values[old_hi:]
+        new_hi = len(new_values) - (len(values) - old_hi)
+        index = GRunIndex(values)
+        index.splice(lo, old_hi, new_hi, lambda offset: new_values[offset])
+        expected = GRunIndex(new_values)
+        assert list(index.run_starts) == list(expected.run_starts)
+        assert list(index.run_lengths) == list(expected.run_lengths)
+        assert list(index.row_runs) == list(expected.row_runs)
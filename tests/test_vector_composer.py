@@ -0,0 +1,20 @@
+import pytest
+
+from row_composer import compose_sheet
+from synthetic_rows import make_store, random_rows
+
+pytest.importorskip("pandas")
+
+
+@pytest.mark.parametrize("announce_group", [True, False])
+@pytest.mark.parametrize("sequential", [True, False])
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_numpy_engine_matches_python(announce_group, sequential, seed):
+    data = make_store(random_rows(500, seed=seed))
+    python = compose_sheet(data, announce_group, sequential, engine='python')
+    numpy = compose_sheet(data, announce_group, sequential, engine='numpy')
+    assert numpy == python
+
+
+def test_numpy_engine_empty_sheet():
+    assert compose_sheet(make_store([]), engine='numpy') == []
@@ -0,0 +1,54 @@
+import asyncio
+import os
+import threading
+
+# 장기 실행 TTS 서비스
+# 전용 스레드에서 이벤트 루프 하나를 계속 돌리고, 다른 스레드(Flask 워커, Tk 등)는
+# submit()/run() 으로 합성 작업을 넘겨 concurrent.futures.Future 를 받습니다.
+# 요청마다 루프를 만들고 닫는 비용이 없고, 여러 합성을 동시에 진행할 수 있습니다.
+
+DEFAULT_TIMEOUT = float(os.environ.get('TTS_TIMEOUT', '30'))
+
+
+class TTSService:
+    def __init__(self, name='tts-service'):
+        self._loop = asyncio.new_event_loop()
+        self._tasks = {}  # key -> 진행 중인 합성 task (루프 스레드에서만 접근)
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    def submit(self, coro):
+        # 아무 스레드에서나 호출 가능. 코루틴을 서비스 루프에서 실행하고 Future 반환
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def run(self, coro, timeout=DEFAULT_TIMEOUT):
+        # submit 후 결과를 기다림 (시간 초과 시 작업 취소)
+        future = self.submit(coro)
+        try:
+            return future.result(timeout)
+        except BaseException:
+            future.cancel()
+            raise
+
+    async def shared(self, key, factory):
+        # 같은 key 의 합성이 이미 진행 중이면 새로 만들지 않고 그 결과를 함께 기다림
+        # (현재 행 요청과 미리 합성이 겹칠 때 중복 합성 방지). 루프 안에서만 await 할 것.
+        task = self._tasks.get(key)
+        if task is None:
+            task = self._loop.create_task(factory())
+            self._tasks[key] = task
+            task.add_done_callback(lambda _: self._tasks.pop(key, None))
+        # 한 쪽(예: 취소된 미리 합성)이 취소돼도 공유 작업은 계속 진행
+        return await asyncio.shield(task)
+
+    def running(self, key):
+        # shared() 로 시작한 같은 key 의 작업이 진행 중인지 (루프 안에서 호출)
+        return key in self._tasks
+
+    def shutdown(self):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
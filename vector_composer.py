@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+
+from row_composer import SIZE_DICT, KOREAN_NUMBER_MAP, quantity_text
+from row_store import COLUMNS
+from sheet_loader import iter_sheet_rows
+
+# pandas/NumPy 벡터 문장 구성 엔진 (row_composer 의 행 단위 엔진과 같은 결과)
+# G~L열을 DataFrame 으로 두고 열 단위 연산만으로 시트 전체 문장을 한 번에 만듭니다.
+# G열 연속 구간은 앞 행과 비교(shift)한 변화 지점의 cumsum 으로 구간 번호를 매겨 길이/위치를 구합니다.
+# row_composer.compose_sheet(engine='numpy') 또는 COMPOSE_ENGINE=numpy 로 선택합니다.
+
+
+def frame_from_rows(data):
+    # RowStore -> DataFrame. 고유값 테이블과 번호 배열을 그대로 써서 G~K열은 category 로 구성
+    columns = {}
+    for name in COLUMNS:
+        values, codes = data.table(name)
+        codes = np.frombuffer(codes, dtype=np.uint32) if len(codes) else np.zeros(0, dtype=np.uint32)
+        if name == 'l':
+            # 수량 열은 숫자/문자열이 섞일 수 있어 object 로 유지
+            table = np.empty(len(values), dtype=object)
+            table[:] = values
+            columns[name] = table[codes]
+        else:
+            columns[name] = pd.Categorical.from_codes(codes.astype(np.int64), categories=values)
+    return pd.DataFrame(columns)
+
+
+def load_frame(source):
+    # 엑셀(G~L열) -> DataFrame. sheet_loader 와 같은 정리 규칙(G~K 문자열 strip)
+    rows = [values for _, values in iter_sheet_rows(source)]
+    columns = list(zip(*rows)) if rows else [()] * len(COLUMNS)
+    frame = pd.DataFrame({name: pd.Series(values, dtype=object) for name, values in zip(COLUMNS, columns)})
+    for name in ('g', 'h', 'i', 'j', 'k'):
+        frame[name] = frame[name].fillna("").astype(str).str.strip()
+    return frame
+
+
+def _unique_table(series, fn):
+    # (행별 번호, 고유값별 변환 문구). 결측(-1)은 마지막 "" 를 가리키도록 번호를 맞춤
+    codes, uniques = pd.factorize(series)
+    table = np.array([fn(v) for v in uniques] + [""], dtype=object)
+    return np.where(codes < 0, len(uniques), codes), table
+
+
+def _join_tables(columns, n):
+    # 여러 (번호, 문구표) 열을 이어 붙인 문장: 번호 조합을 factorize 해서
+    # 서로 다른 조합마다 한 번만 문자열을 만들고 번호로 펼침
+    key = np.zeros(n, dtype=np.int64)
+    for codes, table in columns:
+        key, _ = pd.factorize(key * len(table) + codes)
+    combos = int(key.max()) + 1 if n else 0
+    first = np.empty(combos, dtype=np.int64)
+    first[key[::-1]] = np.arange(n - 1, -1, -1)
+    texts = np.array([" ".join(t for t in (table[codes[r]] for codes, table in columns) if t)
+                      for r in first] + [""], dtype=object)
+    return texts[key]
+
+
+def _identity_table(series):
+    return _unique_table(series, lambda v: v)
+
+
+def compose_frame(frame, announce_group=True, sequential=False):
+    # 시트 전체 문장 (object 배열, 인덱스 0 = 첫 데이터 행)
+    n = len(frame)
+    if n == 0:
+        return np.empty(0, dtype=object)
+
+    # G열 괄호 제거는 고유값에만 문자열 연산을 하고 번호로 펼침
+    raw_codes, raw_uniques = pd.factorize(frame['g'])
+    cleaned = pd.Index(raw_uniques, dtype=object).str.replace(r"\(.*?\)", "", regex=True).str.strip()
+    clean_codes, clean_uniques = pd.factorize(cleaned)
+    g_code = clean_codes[raw_codes]
+    g = np.asarray(clean_uniques, dtype=object)[g_code]
+
+    # 연속 구간 번호: G값이 앞 행과 달라지는 곳마다 +1 (shift 비교 후 cumsum)
+    changed = np.empty(n, dtype=bool)
+    changed[0] = True
+    changed[1:] = g_code[1:] != g_code[:-1]
+    run_id = np.cumsum(changed) - 1
+    run_starts = np.flatnonzero(changed)
+    run_lengths = np.diff(np.append(run_starts, n))
+    position = np.arange(n) - run_starts[run_id]
+    remaining = run_lengths[run_id] - position
+
+    # G 안내: "브랜드 N개" (남은 개수 2 이상), 아니면 "브랜드"
+    announce = (g != "") if announce_group else np.zeros(n, dtype=bool)
+    if sequential:
+        announce &= position == 0
+    counts = np.array([""] + [KOREAN_NUMBER_MAP.get(c, f"{c}개") for c in range(1, run_lengths.max() + 1)],
+                      dtype=object)
+    g_text = np.where(remaining > 1, g + " " + counts[np.where(remaining > 1, remaining, 0)], g)
+    g_text = np.where(announce, g_text, "")
+
+    # 상품명/색상/사이즈/수량은 고유값 문구표 + 번호로 두고, 조합별로 한 번만 이어 붙임
+    tail = _join_tables([
+        _identity_table(frame['i']),
+        _identity_table(frame['j']),
+        _unique_table(frame['k'], lambda v: SIZE_DICT.get(str(v).upper(), v) if v else ""),
+        # 1/1.0/True 처럼 같은 값으로 묶이는 수량은 읽는 문구도 같으므로 factorize 로 충분
+        _unique_table(frame['l'], quantity_text),
+    ], n)
+    sep = np.where((g_text != "") & (tail != ""), " ", "")
+    return g_text + sep + tail
+
+
+def compose_sentences(data, announce_group=True, sequential=False):
+    # RowStore -> 문장 목록 (row_composer.RowComposer.sentences 와 같은 결과)
+    return compose_frame(frame_from_rows(data), announce_group, sequential).tolist()
+